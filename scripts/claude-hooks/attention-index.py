@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Persistent inverted index of project files for context routing.
+
+Maps lowercase keys (paths, basenames, directory and package names,
+exported symbols, .claude doc headings) to the files they point at, so a
+prompt can be matched against the whole monorepo without rescanning it.
+
+Usage:
+  python3 attention-index.py build [--root DIR] [--quiet]
+  python3 attention-index.py query [--root DIR] [--limit N] PROMPT...
+
+`build` is incremental: files are listed from git, and only files whose
+mtime or size changed since the last build are re-read. Directories that
+are not git work trees are skipped rather than walked, so a build in $HOME
+or /usr does nothing. `query` memory-maps
+the index and binary-searches it, so lookups do not depend on repo size.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import subprocess
+import sys
+
+from hooklib import project_root
+
+INDEX_DIR = ".claude/attention-index"
+MAGIC = b"ATIDX001"
+
+# magic, generation, key count, file count, then section offsets
+HEADER = struct.Struct("<8sQIIIIII")
+# key offset, key length, first posting, posting count
+KEY_ENTRY = struct.Struct("<IIII")
+# path offset, path length
+FILE_ENTRY = struct.Struct("<II")
+POSTING = struct.Struct("<I")
+
+SOURCE_SUFFIXES = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".py"}
+MAX_READ_BYTES = 512 * 1024
+
+EXPORT_RE = re.compile(
+    r"^export\s+(?:default\s+)?(?:async\s+)?"
+    r"(?:function\*?|const|let|var|class|interface|type|enum)\s+([A-Za-z_$][\w$]*)",
+    re.MULTILINE,
+)
+PY_DEF_RE = re.compile(r"^(?:async\s+)?(?:def|class)\s+([A-Za-z_]\w*)", re.MULTILINE)
+HEADING_RE = re.compile(r"^#{1,3}\s+(.+)$", re.MULTILINE)
+TOKEN_RE = re.compile(r"[\w@$./-]+")
+
+
+def list_files(root):
+    """Tracked and untracked-but-not-ignored files, relative to root; None outside git."""
+    try:
+        out = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root, capture_output=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    files = {p for p in out.decode("utf-8", "surrogateescape").split("\0") if p}
+    # .claude/ docs are usually untracked and may be gitignored
+    docs = root / ".claude"
+    if docs.is_dir():
+        files.update(str(p.relative_to(root)) for p in docs.rglob("*.md"))
+    return sorted(f for f in files if not f.startswith(INDEX_DIR))
+
+
+def path_keys(path):
+    parts = path.lower().split("/")
+    name = parts[-1]
+    keys = {path.lower(), name, name.split(".")[0]}
+    keys.update(p for p in parts[:-1] if p)
+    # Directory prefixes like "packages/blog"
+    keys.update("/".join(parts[:i]) for i in range(2, len(parts)))
+    # Suffixes like "components/projects/projectcard.tsx" for partial paths
+    keys.update("/".join(parts[i:]) for i in range(1, len(parts) - 1))
+    # Dotfiles like .gitignore have an empty stem
+    keys.discard("")
+    return keys
+
+
+def content_keys(root, path):
+    suffix = os.path.splitext(path)[1]
+    is_doc = path.startswith(".claude/") and suffix == ".md"
+    if suffix not in SOURCE_SUFFIXES and not is_doc and not path.endswith("package.json"):
+        return set()
+    try:
+        with open(root / path, "rb") as f:
+            text = f.read(MAX_READ_BYTES).decode("utf-8", "replace")
+    except OSError:
+        return set()
+
+    if path.endswith("package.json"):
+        try:
+            name = json.loads(text).get("name")
+        except (ValueError, AttributeError):
+            return set()
+        return {"package:" + name.lower()} if isinstance(name, str) else set()
+    if is_doc:
+        words = (w.lower() for h in HEADING_RE.findall(text) for w in re.findall(r"[\w-]+", h))
+        return {w for w in words if len(w) >= 4}
+    pattern = PY_DEF_RE if suffix == ".py" else EXPORT_RE
+    return {symbol.lower() for symbol in pattern.findall(text)}
+
+
+def package_keys(files, manifest):
+    """Map each directory holding a package.json to its package name keys."""
+    packages = {}
+    for path in files:
+        if path == "package.json" or path.endswith("/package.json"):
+            for key in manifest[path][2]:
+                name = key[len("package:"):]
+                packages[os.path.dirname(path)] = {name, name.rsplit("/", 1)[-1]}
+    return packages
+
+
+def nearest_package(path, packages):
+    directory = os.path.dirname(path)
+    while True:
+        if directory in packages:
+            return packages[directory]
+        if not directory:
+            return set()
+        directory = os.path.dirname(directory)
+
+
+def load_manifest(index_dir):
+    try:
+        with open(index_dir / "manifest.json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"generation": 0, "files": {}}
+
+
+def build(root):
+    """Update the index under root; return (generation, files, keys, reindexed) or None outside git."""
+    files = list_files(root)
+    if files is None:
+        return None
+    index_dir = root / INDEX_DIR
+    index_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(index_dir)
+    old_files = previous["files"]
+
+    manifest = {}
+    reindexed = 0
+    for path in files:
+        try:
+            st = os.stat(root / path)
+        except OSError:
+            continue
+        old = old_files.get(path)
+        if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            manifest[path] = old
+        else:
+            manifest[path] = [st.st_mtime_ns, st.st_size, sorted(content_keys(root, path))]
+            reindexed += 1
+
+    if not reindexed and manifest.keys() == old_files.keys() and (index_dir / "index.bin").exists():
+        return previous["generation"], len(manifest), None, 0
+
+    paths = sorted(manifest)
+    packages = package_keys(paths, manifest)
+    postings = {}
+    for file_id, path in enumerate(paths):
+        keys = path_keys(path) | nearest_package(path, packages)
+        keys.update(k for k in manifest[path][2] if not k.startswith("package:"))
+        for key in keys:
+            postings.setdefault(key, []).append(file_id)
+
+    generation = previous["generation"] + 1
+    write_index(index_dir / "index.bin", generation, paths, postings)
+    write_json(index_dir / "manifest.json", {"generation": generation, "files": manifest})
+    return generation, len(paths), len(postings), reindexed
+
+
+def write_json(path, data):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_index(path, generation, paths, postings):
+    keys = sorted(k.encode("utf-8", "surrogateescape") for k in postings)
+    blob = bytearray()
+    key_table = bytearray()
+    posting_data = bytearray()
+    posting_count = 0
+    for key in keys:
+        ids = postings[key.decode("utf-8", "surrogateescape")]
+        key_table += KEY_ENTRY.pack(len(blob), len(key), posting_count, len(ids))
+        blob += key
+        for file_id in ids:
+            posting_data += POSTING.pack(file_id)
+        posting_count += len(ids)
+    file_table = bytearray()
+    for p in paths:
+        encoded = p.encode("utf-8", "surrogateescape")
+        file_table += FILE_ENTRY.pack(len(blob), len(encoded))
+        blob += encoded
+
+    key_off = HEADER.size
+    file_off = key_off + len(key_table)
+    posting_off = file_off + len(file_table)
+    blob_off = posting_off + len(posting_data)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, generation, len(keys), len(paths),
+                            key_off, file_off, posting_off, blob_off))
+        f.write(key_table)
+        f.write(file_table)
+        f.write(posting_data)
+        f.write(blob)
+    # Replacing the file keeps readers that already mapped the old one valid
+    os.replace(tmp, path)
+
+
+class AttentionIndex:
+    """Read-only, memory-mapped view of index.bin."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.generation, self.nkeys, self.nfiles, self.key_off,
+         self.file_off, self.posting_off, self.blob_off) = HEADER.unpack_from(self.mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an attention index")
+
+    def close(self):
+        self.mm.close()
+
+    def _key(self, i):
+        offset, length, first, count = KEY_ENTRY.unpack_from(self.mm, self.key_off + i * KEY_ENTRY.size)
+        start = self.blob_off + offset
+        return self.mm[start:start + length], first, count
+
+    def postings(self, key):
+        """File ids for an exact key."""
+        target = key.encode("utf-8", "surrogateescape")
+        lo, hi = 0, self.nkeys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.nkeys:
+            return ()
+        found, first, count = self._key(lo)
+        if found != target:
+            return ()
+        start = self.posting_off + first * POSTING.size
+        return [POSTING.unpack_from(self.mm, start + j * POSTING.size)[0] for j in range(count)]
+
+    def path(self, file_id):
+        offset, length = FILE_ENTRY.unpack_from(self.mm, self.file_off + file_id * FILE_ENTRY.size)
+        start = self.blob_off + offset
+        return self.mm[start:start + length].decode("utf-8", "surrogateescape")
+
+    def match(self, prompt, limit=10):
+        """Files mentioned by a prompt, best first, as (path, score) pairs.
+
+        Rare keys weigh more than common ones, so "ProjectCard" beats "apps".
+        """
+        scores = {}
+        for token in prompt_tokens(prompt):
+            ids = self.postings(token)
+            for file_id in ids:
+                scores[file_id] = scores.get(file_id, 0.0) + 1.0 / len(ids)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.path(file_id), round(score, 4)) for file_id, score in best]
+
+
+def prompt_tokens(prompt):
+    tokens = set()
+    for raw in TOKEN_RE.findall(prompt.lower()):
+        token = raw.strip("./-")
+        if len(token) < 3:
+            continue
+        tokens.add(token)
+        if "/" in token:
+            tokens.add(token.rsplit("/", 1)[-1])
+    return tokens
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Attention index for context routing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="update the index incrementally")
+    build_parser.add_argument("--root", help="project directory (default: $CLAUDE_PROJECT_DIR or cwd)")
+    build_parser.add_argument("--quiet", action="store_true", help="print nothing (for hooks)")
+    query_parser = sub.add_parser("query", help="match a prompt against the index")
+    query_parser.add_argument("--root", help="project directory (default: $CLAUDE_PROJECT_DIR or cwd)")
+    query_parser.add_argument("--limit", type=int, default=10)
+    query_parser.add_argument("prompt", nargs="+")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    root = project_root(args.root)
+
+    if args.command == "build":
+        result = build(root)
+        if result is None:
+            if not args.quiet:
+                print(f"✓ {root} is not a git work tree, no attention index built")
+            return 0
+        generation, files, keys, reindexed = result
+        if not args.quiet:
+            if keys is None:
+                print(f"✓ Attention index up to date ({files} files, generation {generation})")
+            else:
+                print(f"✓ Attention index built ({files} files, {keys} keys, "
+                      f"{reindexed} re-read, generation {generation})")
+        return 0
+
+    try:
+        index = AttentionIndex(root / INDEX_DIR / "index.bin")
+    except (OSError, ValueError) as e:
+        print(f"attention-index: {e}", file=sys.stderr)
+        return 1
+    for path, score in index.match(" ".join(args.prompt), args.limit):
+        print(f"{score:8.4f}  {path}")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
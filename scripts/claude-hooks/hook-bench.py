@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hook commands configured in ~/.claude/settings.json.
+
+Replays synthetic sessions (SessionStart, a run of prompts, Stop) through
+exactly the commands in settings["hooks"], once per pool size, inside a
+throwaway HOME and project directory so real pool and attention state are
+never touched. Hooks installed with --daemon go through the real daemon's
+socket when it is running; the daemon runs them with the sandbox's HOME
+and project too.
+
+Usage:
+  python3 hook-bench.py --sizes 10,1000,100000 --runs 20 --sessions 5 --out hook-bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hooklib import SOCKET_ENV, parse_importtime, percentile, socket_path
+
+PROMPTS = [
+    "Fix the pagination bug in apps/web/components/releases/ReleaseTimelineWithLoadMore.tsx",
+    "Why does packages/blog render MDX twice on the post page?",
+    "Add a Letter page size to packages/pmdxjs and update the CV theme",
+    "services/pdf-generator times out on long CVs, check server.ts",
+    "Update the sitemap test in apps/web/app/sitemap.test.ts",
+    "What does the Directus integration doc say about personas?",
+]
+
+HOOK_TIMEOUT = 60
+
+# A script run by a configured command, with its arguments: run directly,
+# through hooks.pyz (--optimize) or through hook-client.py (--daemon)
+HOOK_SCRIPT = re.compile(
+    r"(?:scripts/|hooks\.pyz |hook-client\.py (?:--trace \w+ )?)([\w-]+\.py)\b((?: [\w-]+)*)")
+WRAPPERS = {"hook-client.py", "hook-dispatch.py", "hook-trace.py"}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark configured Claude Code hooks")
+    parser.add_argument("--settings", type=Path, default=Path.home() / ".claude/settings.json")
+    parser.add_argument("--sizes", default="10,1000,100000",
+                        help="comma-separated pool sizes to benchmark (default: 10,1000,100000)")
+    parser.add_argument("--runs", type=int, default=20,
+                        help="prompts replayed per pool size (default: 20)")
+    parser.add_argument("--sessions", type=int, default=5,
+                        help="sessions the prompts are spread over, each with its own "
+                             "SessionStart and Stop (default: 5)")
+    parser.add_argument("--out", type=Path, default=Path("hook-bench.json"))
+    return parser.parse_args()
+
+
+def configured_hooks(settings_path):
+    """Map each event to its hook commands, in settings order."""
+    with open(settings_path) as f:
+        settings = json.load(f)
+    hooks = {}
+    for event, groups in settings.get("hooks", {}).items():
+        hooks[event] = [
+            hook["command"]
+            for group in groups
+            for hook in group.get("hooks", [])
+            if hook.get("type") == "command"
+        ]
+    return hooks
+
+
+def pool_entry(i, now):
+    return {
+        "id": f"bench-{i}",
+        "timestamp": int(now) - i * 60,
+        "source_instance": "ABC"[i % 3],
+        "action": "completed",
+        "topic": f"Synthetic entry {i}",
+        "summary": PROMPTS[i % len(PROMPTS)],
+        "relevance": {"files": ["apps/web/app/page.tsx"], "keywords": ["bench"]},
+    }
+
+
+def make_sandbox(root, pool_size):
+    """Create a HOME and project with pool_size entries; return (home, project)."""
+    home = root / "home"
+    project = root / "project"
+    real_scripts = Path.home() / ".claude/scripts"
+    (home / ".claude").mkdir(parents=True)
+    if real_scripts.exists():
+        (home / ".claude/scripts").symlink_to(real_scripts)
+
+    pool = project / ".claude/pool"
+    pool.mkdir(parents=True)
+    (project / ".claude/modules").mkdir()
+    (project / ".claude/modules/blog.md").write_text("# Blog\n\npackages/blog, MDX pipeline\n")
+    (project / ".claude/modules/cv-builder.md").write_text("# CV Builder\n\npackages/pmdxjs\n")
+
+    now = time.time()
+    with open(pool / "instance_state.jsonl", "w") as f:
+        for i in reversed(range(pool_size)):
+            f.write(json.dumps(pool_entry(i, now)) + "\n")
+    (home / ".claude/pool").symlink_to(pool)
+    return home, project
+
+
+def hook_scripts(command):
+    """The hook scripts a command runs, with their arguments, skipping the wrappers."""
+    scripts = []
+    for name, args in HOOK_SCRIPT.findall(command):
+        script = name + args
+        if name not in WRAPPERS and script not in scripts:
+            scripts.append(script)
+    return scripts
+
+
+def run_hook(command, payload, env, cwd):
+    """Run one hook command; return (seconds, returncode, peak RSS in KiB, stdout bytes, stderr)."""
+    with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stdout, \
+            tempfile.TemporaryFile() as stderr:
+        stdin.write(payload)
+        stdin.seek(0)
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, shell=True, stdin=stdin, stdout=stdout,
+                                stderr=stderr, env=env, cwd=cwd)
+        deadline = start + HOOK_TIMEOUT
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is bytes on macOS, KiB elsewhere
+        rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        stderr.seek(0)
+        return elapsed, proc.returncode, rss, stdout.tell(), stderr.read().decode(errors="replace")
+
+
+def summarize(samples):
+    ms = [s * 1000 for s in samples]
+    return {
+        "count": len(ms),
+        "mean_ms": round(sum(ms) / len(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def event_payloads(project, runs, sessions):
+    """Synthetic sessions: each a SessionStart, its share of `runs` prompts, and a Stop."""
+    for n in range(sessions):
+        transcript = project / f"transcript-{n}.jsonl"
+        session = {"session_id": f"hook-bench-{n}", "transcript_path": str(transcript),
+                   "cwd": str(project)}
+        yield "SessionStart", {**session, "hook_event_name": "SessionStart", "source": "startup"}
+        yield from session_prompts(session, transcript, range(n, runs, sessions))
+        yield "Stop", {**session, "hook_event_name": "Stop", "stop_hook_active": False}
+
+
+def session_prompts(session, transcript, prompts):
+    for i in prompts:
+        prompt = PROMPTS[i % len(PROMPTS)]
+        with open(transcript, "a") as f:
+            f.write(json.dumps({"type": "user", "message": {"role": "user", "content": prompt}}) + "\n")
+            f.write(json.dumps({"type": "assistant", "message": {
+                "role": "assistant", "content": [{"type": "text", "text": f"Looked at: {prompt}"}]}}) + "\n")
+        yield "UserPromptSubmit", {**session, "hook_event_name": "UserPromptSubmit", "prompt": prompt}
+
+
+def bench_size(hooks, pool_size, runs, sessions):
+    with tempfile.TemporaryDirectory(prefix="hook-bench-") as tmp:
+        home, project = make_sandbox(Path(tmp), pool_size)
+        # The daemon socket is resolved against the real HOME, not the sandbox
+        env = {**os.environ, "HOME": str(home), "CLAUDE_PROJECT_DIR": str(project),
+               SOCKET_ENV: str(socket_path())}
+        env.setdefault("CLAUDE_INSTANCE", "A")
+
+        results = {}
+        for event, payload in event_payloads(project, runs, sessions):
+            data = json.dumps(payload).encode()
+            stats = results.setdefault(event, {"samples": [], "hooks": {}})
+            event_total = 0.0
+            for command in hooks.get(event, []):
+                hook = stats["hooks"].setdefault(command, {
+                    "samples": [], "cold_ms": None, "peak_rss_kib": 0,
+                    "stdout_bytes_max": 0, "failures": 0,
+                })
+                elapsed, returncode, rss, out_bytes, err = run_hook(command, data, env, project)
+                if hook["cold_ms"] is None:
+                    hook["cold_ms"] = round(elapsed * 1000, 3)
+                else:
+                    hook["samples"].append(elapsed)
+                hook["peak_rss_kib"] = max(hook["peak_rss_kib"], rss)
+                hook["stdout_bytes_max"] = max(hook["stdout_bytes_max"], out_bytes)
+                if returncode not in (0, 2):
+                    hook["failures"] += 1
+                    hook["last_error"] = err[-500:]
+                event_total += elapsed
+            stats["samples"].append(event_total)
+
+        for event, stats in results.items():
+            for command, hook in stats["hooks"].items():
+                # Time the hook scripts themselves, run on their own, not the wrappers
+                hook["import_ms"] = {}
+                for script in hook_scripts(command):
+                    name, *script_args = script.split()
+                    timed = [sys.executable, "-X", "importtime",
+                             str(home / ".claude/scripts" / name), *script_args]
+                    _, _, _, _, err = run_hook(shlex.join(timed), b"{}", env, project)
+                    hook["import_ms"][script] = round(parse_importtime(err) / 1000, 3)
+                samples = hook.pop("samples")
+                hook["warm"] = summarize(samples) if samples else None
+            stats.update(summarize(stats.pop("samples")))
+        return results
+
+
+def print_report(report):
+    for size, events in report["sizes"].items():
+        print(f"\nPool size {size}")
+        for event, stats in events.items():
+            print(f"  {event}: p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms")
+            for command, hook in stats["hooks"].items():
+                warm = hook["warm"] or {}
+                imports = ", ".join(f"{script} {ms}ms" for script, ms in hook["import_ms"].items())
+                print(f"    {command}")
+                print(f"      cold {hook['cold_ms']}ms  warm p50 {warm.get('p50_ms', '-')}ms"
+                      f"  p95 {warm.get('p95_ms', '-')}ms  p99 {warm.get('p99_ms', '-')}ms"
+                      f"  rss {hook['peak_rss_kib']}KiB  failures {hook['failures']}")
+                print(f"      import {imports or '-'}")
+
+
+def main():
+    args = parse_args()
+    hooks = configured_hooks(args.settings)
+    if not any(hooks.values()):
+        print(f"No hook commands configured in {args.settings}", file=sys.stderr)
+        return 1
+
+    uses_daemon = any("hook-client.py" in command for commands in hooks.values() for command in commands)
+    daemon = uses_daemon and socket_path().is_socket()
+    if uses_daemon and not daemon:
+        print(f"hook-daemon.py is not listening on {socket_path()}: the --daemon hooks are "
+              "benchmarked on their per-process fallback", file=sys.stderr)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": str(args.settings),
+        "runs": args.runs,
+        "sessions": args.sessions,
+        "daemon": daemon,
+        "hooks": hooks,
+        "sizes": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Benchmarking pool size {size}...", file=sys.stderr)
+        report["sizes"][str(size)] = bench_size(hooks, size, args.runs, args.sessions)
+
+    args.out.write_text(json.dumps(report, indent=2) + "\n")
+    print_report(report)
+    print(f"\n✓ Results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
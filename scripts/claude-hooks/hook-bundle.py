@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Bundle the hook scripts into one precompiled zipapp for fast startup.
+
+Usage:
+  python3 hook-bundle.py build                  # write ~/.claude/scripts/hooks.pyz
+  python3 hook-bundle.py verify                 # exit 1 if the bundle is stale
+  python3 hook-bundle.py report SCRIPT...       # import time, loose vs bundled
+
+  python3 -I -S ~/.claude/scripts/hooks.pyz context-router-v2.py
+
+Every .py in ~/.claude/scripts/ is stored as bytecode only, so nothing is
+parsed or compiled at hook time. Importable modules (hooklib, ...) sit at
+the archive root where zipimport finds them. The bootstrap checks the
+interpreter's bytecode magic and the source mtimes recorded at build time;
+if either differs it runs the loose scripts instead, so a stale bundle is
+slow but never wrong.
+"""
+
+import argparse
+import ast
+import marshal
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+
+from hooklib import parse_importtime, scripts_dir
+
+BUNDLE_NAME = "hooks.pyz"
+MANIFEST = "manifest.marshal"
+
+BOOTSTRAP = '''\
+import marshal
+import os
+import sys
+from importlib._bootstrap_external import MAGIC_NUMBER
+
+archive = os.path.dirname(__file__)
+scripts = os.path.dirname(archive)
+manifest = marshal.loads(__loader__.get_data(os.path.join(archive, "manifest.marshal")))
+
+
+def fresh():
+    if manifest["magic"] != MAGIC_NUMBER:
+        return False
+    for name, entry in manifest["scripts"].items():
+        try:
+            st = os.stat(os.path.join(scripts, name))
+        except OSError:
+            continue
+        if (st.st_mtime_ns, st.st_size) != entry["stat"]:
+            return False
+    return True
+
+
+if len(sys.argv) < 2:
+    sys.exit("usage: hooks.pyz <script.py> [args...]")
+name = sys.argv[1]
+source = os.path.join(scripts, name)
+entry = manifest["scripts"].get(name)
+if entry and fresh():
+    code = marshal.loads(__loader__.get_data(os.path.join(archive, entry["pyc"]))[16:])
+    sys.path.append(scripts)
+else:
+    # Stale or unknown: run from source, preferring loose modules too
+    with open(source, "rb") as f:
+        code = compile(f.read(), source, "exec")
+    sys.path.insert(0, scripts)
+sys.argv = [source, *sys.argv[2:]]
+del name, entry
+exec(code, {"__name__": "__main__", "__file__": source, "__builtins__": __builtins__})
+'''
+
+
+def pyc_bytes(code, st):
+    """A timestamp .pyc: magic, flags, source mtime, source size, marshalled code."""
+    header = MAGIC_NUMBER + (0).to_bytes(4, "little")
+    header += (int(st.st_mtime) & 0xFFFFFFFF).to_bytes(4, "little")
+    header += (st.st_size & 0xFFFFFFFF).to_bytes(4, "little")
+    return header + marshal.dumps(code)
+
+
+def imported_modules(tree):
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+
+def no_site_safe(imports, bundled):
+    """Scripts whose imports (through bundled modules) are all stdlib can run with -I -S."""
+    stdlib = getattr(sys, "stdlib_module_names", None)
+    if stdlib is None:
+        return dict.fromkeys(imports, False)
+
+    def external(name, seen):
+        if name in seen:
+            return set()
+        seen.add(name)
+        outside = set()
+        for module in imports[name]:
+            if module in bundled:
+                outside |= external(bundled[module], seen)
+            elif module not in stdlib:
+                outside.add(module)
+        return outside
+
+    return {name: not external(name, set()) for name in imports}
+
+
+def build(directory):
+    """Write hooks.pyz for every script in directory; return the manifest."""
+    sources = sorted(p for p in directory.glob("*.py") if p.name != Path(__file__).name)
+    compiled, imports, bundled = {}, {}, {}
+    for path in sources:
+        text = path.read_bytes()
+        tree = ast.parse(text, str(path))
+        compiled[path.name] = (compile(tree, str(path), "exec"), path.stat())
+        imports[path.name] = imported_modules(tree)
+        if path.stem.isidentifier():
+            bundled[path.stem] = path.name
+    safe = no_site_safe(imports, bundled)
+
+    manifest = {"magic": MAGIC_NUMBER, "built_at": time.time(), "scripts": {}}
+    tmp = directory / (BUNDLE_NAME + ".tmp")
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED) as bundle:
+        for name, (code, st) in compiled.items():
+            stem = name[:-3]
+            pyc = f"{stem}.pyc" if stem.isidentifier() else f"scripts/{stem}.pyc"
+            bundle.writestr(pyc, pyc_bytes(code, st))
+            manifest["scripts"][name] = {
+                "pyc": pyc,
+                "stat": (st.st_mtime_ns, st.st_size),
+                "flags": "-I -S" if safe[name] else "",
+            }
+        bootstrap = compile(BOOTSTRAP, "__main__.py", "exec")
+        bundle.writestr("__main__.pyc", pyc_bytes(bootstrap, os.stat(__file__)))
+        bundle.writestr(MANIFEST, marshal.dumps(manifest))
+    os.replace(tmp, directory / BUNDLE_NAME)
+    return manifest
+
+
+def read_manifest(directory):
+    with zipfile.ZipFile(directory / BUNDLE_NAME) as bundle:
+        return marshal.loads(bundle.read(MANIFEST))
+
+
+def stale_scripts(directory):
+    """Names of scripts that changed, appeared or disappeared since the build."""
+    manifest = read_manifest(directory)
+    if manifest["magic"] != MAGIC_NUMBER:
+        return ["<python version>"]
+    current = {p.name for p in directory.glob("*.py") if p.name != Path(__file__).name}
+    stale = sorted(current ^ manifest["scripts"].keys())
+    for name in sorted(current & manifest["scripts"].keys()):
+        st = (directory / name).stat()
+        if (st.st_mtime_ns, st.st_size) != tuple(manifest["scripts"][name]["stat"]):
+            stale.append(name)
+    return stale
+
+
+def import_ms(command, sandbox):
+    """Best of three -X importtime runs of a command, in milliseconds."""
+    project = sandbox / "project"
+    env = {**os.environ, "HOME": str(sandbox), "CLAUDE_PROJECT_DIR": str(project)}
+    best = None
+    for _ in range(3):
+        result = subprocess.run(command, input=b"{}", capture_output=True, cwd=project, env=env)
+        micros = parse_importtime(result.stderr.decode(errors="replace"))
+        best = micros if best is None else min(best, micros)
+    return best / 1000
+
+
+def report(directory, scripts):
+    manifest = read_manifest(directory)
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="hook-bundle-") as tmp:
+        # Hooks run against a throwaway HOME and project, as in hook-bench.py,
+        # so measuring them touches no real state
+        sandbox = Path(tmp)
+        (sandbox / ".claude").mkdir()
+        (sandbox / "project/.claude").mkdir(parents=True)
+        (sandbox / ".claude/scripts").symlink_to(directory)
+        for script in scripts:
+            name, *args = script.split()
+            entry = manifest["scripts"].get(name)
+            if entry is None:
+                continue
+            before = import_ms([sys.executable, "-X", "importtime", str(directory / name), *args], sandbox)
+            after = import_ms([sys.executable, "-X", "importtime", *entry["flags"].split(),
+                               str(directory / BUNDLE_NAME), name, *args], sandbox)
+            rows.append((script, entry["flags"] or "-", before, after))
+
+    width = max([len(row[0]) for row in rows] + [4])
+    print(f"{'Hook':<{width}}  {'Flags':<6}  {'Before':>9}  {'After':>9}")
+    for script, flags, before, after in rows:
+        print(f"{script:<{width}}  {flags:<6}  {before:>7.2f}ms  {after:>7.2f}ms")
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bundle hook scripts into a precompiled zipapp")
+    parser.add_argument("--dir", type=Path, default=scripts_dir(), help="scripts directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help=f"write {BUNDLE_NAME}")
+    sub.add_parser("verify", help="exit 1 if the bundle is out of date")
+    report_parser = sub.add_parser("report", help="compare import time of loose and bundled hooks")
+    report_parser.add_argument("scripts", nargs="+", help='hook scripts, e.g. "pool-store.py load"')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "build":
+        manifest = build(args.dir)
+        print(f"✓ Bundled {len(manifest['scripts'])} scripts into {args.dir / BUNDLE_NAME}")
+        return 0
+
+    try:
+        stale = stale_scripts(args.dir)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print(f"✗ No usable bundle: {e}")
+        return 1
+    if args.command == "verify":
+        if stale:
+            print(f"✗ Bundle is stale: {', '.join(stale)}")
+            return 1
+        print("✓ Bundle bytecode is up to date")
+        return 0
+
+    report(args.dir, args.scripts)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Forward a hook payload to hook-daemon.py over its Unix socket.
+
+Usage (from settings.json):
+  python3 -S ~/.claude/scripts/hook-client.py context-router-v2.py
+  python3 -S ~/.claude/scripts/hook-client.py pool-store.py load
+  python3 -S ~/.claude/scripts/hook-client.py --trace SessionStart pool-store.py load
+
+The installer only calls the client when the daemon's socket exists, so a
+stopped daemon costs no extra interpreter. The daemon runs one hook at a
+time. If it has not started this one within QUEUE_TIMEOUT (busy with
+another hook or instance, or not answering), or the socket is stale, the
+client replaces itself with the script (os.execv), same as the
+per-process install. The daemon announces a start and runs the hook only
+once the client confirms it; a client that has given up never confirms,
+and a daemon that gets no confirmation in time declines the run, so a hook
+never runs twice.
+
+The client is on every hook's critical path, so it avoids hooklib (json,
+pathlib) and the socket module (enum): it talks the daemon's marshal
+framing over _socket and imports nothing that is not already loaded.
+
+With --trace EVENT (installer --trace) the client records the hook's span
+in hookring.py's ring buffer after the reply, so tracing a daemon hook
+costs no extra interpreter. A traced hook that falls back runs the script
+as a child instead of exec'ing it, so its span is recorded too.
+"""
+
+import _socket
+import marshal
+import os
+import sys
+import time
+
+# Keep in sync with hooklib.FRAME_MAGIC / hooklib.socket_path()
+FRAME_MAGIC = b"M"
+# Seconds the daemon may keep this hook queued behind others
+QUEUE_TIMEOUT = 0.25
+# Extra seconds allowed for connecting and for the daemon's reply to arrive
+CONNECT_TIMEOUT = 1
+
+
+def socket_path():
+    return os.environ.get("CLAUDE_HOOK_SOCKET") or os.path.expanduser("~/.claude/run/hook-daemon.sock")
+
+
+def connect():
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path())
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise ConnectionError("hook daemon closed the connection")
+        data += chunk
+    return bytes(data)
+
+
+def send_frame(sock, message):
+    body = marshal.dumps(message)
+    sock.sendall(FRAME_MAGIC + len(body).to_bytes(4, "little") + body)
+
+
+def recv_frame(sock):
+    header = recv_exactly(sock, 5)
+    return marshal.loads(recv_exactly(sock, int.from_bytes(header[1:], "little")))
+
+
+def start(sock, script, argv, payload):
+    """Hand the hook to the daemon; True once we have confirmed its start.
+
+    Only the confirmation commits the daemon to running the hook, so after
+    a False return the caller can run it itself.
+    """
+    sock.settimeout(QUEUE_TIMEOUT + CONNECT_TIMEOUT)
+    try:
+        send_frame(sock, {
+            "script": script,
+            "argv": argv,
+            "payload": payload,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+            "wait": QUEUE_TIMEOUT,
+        })
+        if not recv_frame(sock).get("started"):
+            return False
+        send_frame(sock, {"go": True})
+        return True
+    except (OSError, ValueError, EOFError):
+        return False
+
+
+def record_span(trace, payload, stdout, code):
+    import hookring
+
+    hookring.try_record({
+        "started": trace["started"], "duration_ms": (time.perf_counter() - trace["t0"]) * 1000,
+        "bytes_in": len(payload), "bytes_out": len(stdout), "code": code,
+        "event": trace["event"], "hook": trace["hook"],
+    })
+
+
+def run_locally(script, argv, payload=None, trace=None):
+    """Replace this process with the script, re-feeding stdin if it was already read.
+
+    A traced hook runs as a child instead, so its span can be recorded.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), script)
+    if trace is not None:
+        import subprocess
+
+        if payload is None:
+            payload = sys.stdin.buffer.read()
+        result = subprocess.run([sys.executable, path, *argv], input=payload, capture_output=True)
+        sys.stdout.buffer.write(result.stdout)
+        sys.stderr.buffer.write(result.stderr)
+        record_span(trace, payload, result.stdout, result.returncode)
+        sys.exit(result.returncode if result.returncode >= 0 else 128 - result.returncode)
+    if payload is not None:
+        import tempfile
+
+        stdin = tempfile.TemporaryFile()
+        stdin.write(payload)
+        stdin.seek(0)
+        os.dup2(stdin.fileno(), 0)
+    os.execv(sys.executable, [sys.executable, path, *argv])
+
+
+def main():
+    args = sys.argv[1:]
+    trace = None
+    if args[:1] == ["--trace"] and len(args) > 2:
+        trace = {"event": args[1], "hook": " ".join(args[2:]),
+                 "started": time.time(), "t0": time.perf_counter()}
+        args = args[2:]
+    if not args or args[0].startswith("-"):
+        print("usage: hook-client.py [--trace EVENT] <script.py> [args...]", file=sys.stderr)
+        return 1
+    script, argv = args[0], args[1:]
+
+    sock = connect()
+    if sock is None:
+        run_locally(script, argv, trace=trace)
+    payload = sys.stdin.buffer.read()
+
+    if not start(sock, script, argv, payload):
+        # Unconfirmed, so the daemon won't run it
+        sock.close()
+        run_locally(script, argv, payload, trace)
+
+    # The daemon may be running the hook now, so a broken connection is
+    # reported rather than retried in-process.
+    try:
+        sock.settimeout(None)
+        reply = recv_frame(sock)
+    except (OSError, ValueError, EOFError) as e:
+        print(f"hook-client: {script}: {e}", file=sys.stderr)
+        if trace is not None:
+            record_span(trace, payload, b"", 1)
+        return 1
+    finally:
+        sock.close()
+    if reply.get("busy"):
+        # The confirmation came too late for the daemon, which declined the run
+        run_locally(script, argv, payload, trace)
+
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    if trace is not None:
+        record_span(trace, payload, reply["stdout"].encode(), reply["code"])
+    return reply["code"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
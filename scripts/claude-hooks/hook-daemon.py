@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Long-lived hook server for Claude Cognitive.
+
+Keeps one warm interpreter with the hook scripts compiled and their imports
+loaded, and runs them on behalf of hook-client.py. Start it once per machine:
+
+  python3 ~/.claude/scripts/hook-daemon.py &
+
+Hook scripts run one at a time, across every Claude instance using the
+daemon: each run swaps in the caller's stdin, stdout, environment and
+working directory, which are process-wide. A hook that cannot start within
+the client's wait is declined, and hook-client.py runs it itself, so a slow
+Stop extractor in one instance does not hold up prompts in another.
+
+The daemon is also a small pub/sub hub: `subscribe` connections stay open
+and receive every message sent to their topic with `publish`. pool-store.py
+uses it to push new pool entries to other instances.
+"""
+
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+from hooklib import (
+    FRAME_MAGIC, connect_daemon, recv_frame, recv_message, render_cache_stats, scripts_dir,
+    send_frame, send_message, socket_path,
+)
+
+# Seconds to wait for hook-client.py to confirm a start before declining the run
+CONFIRM_TIMEOUT = 1
+
+
+class HookRunner:
+    """Runs hook scripts in-process, recompiling only when they change on disk."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.compiled = {}
+        self.lock = threading.Lock()
+
+    def code_for(self, script):
+        path = (self.directory / script).resolve()
+        if path.parent != self.directory.resolve() or path.suffix != ".py":
+            raise ValueError(f"not a hook script: {script}")
+        mtime = path.stat().st_mtime_ns
+        cached = self.compiled.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, compile(path.read_bytes(), str(path), "exec"))
+            self.compiled[path] = cached
+        return path, cached[1]
+
+    def run(self, script, argv, payload, env, cwd, wait=None, started=None):
+        """Run a script; {"busy": True} if another run holds the lock for over wait seconds.
+
+        started() is called once the lock is held, before the script runs; if
+        it returns False (the client did not confirm), the run is declined as busy.
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        if not self.lock.acquire(timeout=-1 if wait is None else wait):
+            return {"busy": True}
+        try:
+            if started is not None and not started():
+                return {"busy": True}
+            saved = (sys.argv, sys.stdin, sys.stdout, sys.stderr, dict(os.environ), os.getcwd())
+            try:
+                path, code = self.code_for(script)
+                os.environ.clear()
+                os.environ.update(env)
+                os.chdir(cwd)
+                sys.argv = [str(path), *argv]
+                sys.stdin = io.TextIOWrapper(io.BytesIO(payload))
+                sys.stdout, sys.stderr = stdout, stderr
+                exec(code, {"__name__": "__main__", "__file__": str(path)})
+                returncode = 0
+            except SystemExit as e:
+                returncode = exit_code(e, stderr)
+            except BaseException:
+                traceback.print_exc(file=stderr)
+                returncode = 1
+            finally:
+                sys.argv, sys.stdin, sys.stdout, sys.stderr = saved[:4]
+                os.environ.clear()
+                os.environ.update(saved[4])
+                os.chdir(saved[5])
+        finally:
+            self.lock.release()
+        return {"code": returncode, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+
+def exit_code(exc, stderr):
+    """Translate SystemExit the way the interpreter would at shutdown."""
+    if exc.code is None:
+        return 0
+    if isinstance(exc.code, int):
+        return exc.code
+    print(exc.code, file=stderr)
+    return 1
+
+
+class HookHandler(socketserver.StreamRequestHandler):
+    def confirm_start(self):
+        """Announce a start; True once the client confirms it still wants the run."""
+        try:
+            send_frame(self.connection, {"started": True})
+            self.connection.settimeout(CONFIRM_TIMEOUT)
+            confirm = recv_frame(self.rfile)
+            self.connection.settimeout(None)
+        except (OSError, ValueError, EOFError):
+            return False
+        return bool(confirm and confirm.get("go"))
+
+    def handle(self):
+        if self.rfile.peek(1)[:1] == FRAME_MAGIC:
+            # hook-client.py: a run request in marshal framing
+            request = recv_frame(self.rfile)
+            if request is None:
+                return
+            try:
+                reply = self.server.runner.run(
+                    request["script"], request["argv"], request["payload"],
+                    request["env"], request["cwd"], wait=request.get("wait"),
+                    started=self.confirm_start,
+                )
+                send_frame(self.connection, reply)
+            except OSError:
+                # The client gave up waiting and runs the hook itself
+                pass
+            return
+        request = recv_message(self.rfile)
+        if request is None:
+            return
+        if request.get("op") == "subscribe":
+            # A stalled subscriber must not hold up publishers for long
+            self.connection.settimeout(5)
+            self.server.subscribe(request["topic"], self.connection)
+            try:
+                send_message(self.connection, {"ok": True})
+                # Subscribers only listen; wait until they hang up
+                while True:
+                    try:
+                        if not self.connection.recv(1024):
+                            break
+                    except socket.timeout:
+                        # Not a TimeoutError before Python 3.10
+                        continue
+            except OSError:
+                pass
+            finally:
+                self.server.unsubscribe(request["topic"], self.connection)
+            return
+        if request.get("op") == "publish":
+            delivered = self.server.publish(request["topic"], request["messages"])
+            reply = {"ok": True, "delivered": delivered}
+        elif request.get("op") == "ping":
+            reply = {"ok": True, "pid": os.getpid(), "render_caches": render_cache_stats()}
+        else:
+            reply = {"code": 1, "stdout": "", "stderr": f"hook-daemon: unknown op {request.get('op')!r}\n"}
+        send_message(self.connection, reply)
+
+
+class HookServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, runner):
+        self.runner = runner
+        self.subscribers = {}
+        self.pubsub_lock = threading.Lock()
+        super().__init__(str(path), HookHandler)
+
+    def subscribe(self, topic, connection):
+        with self.pubsub_lock:
+            self.subscribers.setdefault(topic, set()).add(connection)
+
+    def unsubscribe(self, topic, connection):
+        with self.pubsub_lock:
+            self.subscribers.get(topic, set()).discard(connection)
+
+    def publish(self, topic, messages):
+        """Send messages to every subscriber of topic; return how many received them."""
+        delivered = 0
+        with self.pubsub_lock:
+            for connection in list(self.subscribers.get(topic, ())):
+                try:
+                    for message in messages:
+                        send_message(connection, message)
+                    delivered += 1
+                except OSError:
+                    self.subscribers[topic].discard(connection)
+        return delivered
+
+
+def main():
+    path = socket_path()
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if path.exists():
+        sock = connect_daemon(timeout=1)
+        if sock is not None:
+            sock.close()
+            print(f"hook-daemon: already running on {path}", file=sys.stderr)
+            return 1
+        # Left behind by a daemon that did not shut down cleanly
+        path.unlink()
+
+    directory = scripts_dir()
+    sys.path.insert(0, str(directory))
+    # Create the socket owner-only from the start rather than chmod after bind
+    umask = os.umask(0o077)
+    try:
+        server = HookServer(path, HookRunner(directory))
+    finally:
+        os.umask(umask)
+
+    def shutdown(signum, frame):
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    print(f"hook-daemon listening on {path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
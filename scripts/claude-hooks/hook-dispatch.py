@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Run several hook commands concurrently under one latency budget.
+
+Usage (from settings.json):
+  python3 ~/.claude/scripts/hook-dispatch.py --budget-ms 2000 \\
+      --required "python3 ~/.claude/scripts/context-router-v2.py" \\
+      --optional "python3 ~/.claude/scripts/pool-auto-update.py"
+
+Every hook gets the same payload on stdin and starts at once. The dispatcher
+returns as soon as the required hooks have finished; required hooks that
+overrun the budget are cancelled. Optional hooks run for their side effects
+only: they are never waited for, and their output and exit codes are
+ignored, so what the dispatcher prints does not depend on whether they
+happened to finish first.
+
+Output of the required hooks is merged in the order they were given, not
+the order they finished. A required hook exiting with 2 (block) makes the
+dispatcher exit with 2.
+
+With --trace EVENT (installer --trace) the dispatcher records a span per
+required hook, named by the --name options in order, and an aggregate
+span for itself in hookring.py's ring buffer. Cancelled hooks are
+recorded with the signal as a negative exit code. Optional hooks may
+outlive the dispatcher, so they record their own spans (the installer
+runs them through hook-client.py --trace or hook-trace.py run).
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+class Hook:
+    def __init__(self, command, required):
+        self.command = command
+        self.required = required
+        self.proc = None
+        self.returncode = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def start(self, payload):
+        stdin = tempfile.TemporaryFile()
+        stdin.write(payload)
+        stdin.seek(0)
+        # Output goes to files rather than pipes so a hook left in the
+        # background does not die on a closed pipe once we exit.
+        self.stdout = tempfile.TemporaryFile()
+        self.stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            self.command,
+            shell=True,
+            stdin=stdin,
+            stdout=self.stdout,
+            stderr=self.stderr,
+            start_new_session=True,
+        )
+        stdin.close()
+        # Popen.wait(timeout) polls with sleeps of up to 50ms; a blocking
+        # wait in a thread wakes us as soon as the hook exits.
+        threading.Thread(target=self.reap, daemon=True).start()
+
+    def reap(self):
+        self.returncode = self.proc.wait()
+        self.finished = time.perf_counter()
+        self.done.set()
+
+    def wait(self, deadline):
+        return self.done.wait(max(deadline - time.monotonic(), 0))
+
+    def cancel(self):
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.done.wait()
+
+    def output(self, stream):
+        stream.seek(0)
+        return stream.read()
+
+    def output_bytes(self):
+        return os.fstat(self.stdout.fileno()).st_size
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run hook commands concurrently")
+    parser.add_argument("--budget-ms", type=int, default=2000,
+                        help="latency budget for the whole event (default: 2000)")
+    parser.add_argument("--required", dest="hooks", action="append", default=[],
+                        type=lambda command: Hook(command, True),
+                        help="hook to wait for; cancelled if it overruns the budget")
+    parser.add_argument("--optional", dest="hooks", action="append", default=[],
+                        type=lambda command: Hook(command, False),
+                        help="hook run in the background; its output is ignored")
+    parser.add_argument("--trace", metavar="EVENT",
+                        help="record spans for this hook event (see hook-trace.py)")
+    parser.add_argument("--name", dest="names", action="append", default=[],
+                        help="name to trace a required hook under, once per required hook in order")
+    return parser.parse_args()
+
+
+def dispatch(hooks, payload, budget_ms):
+    deadline = time.monotonic() + budget_ms / 1000
+    for hook in hooks:
+        hook.start(payload)
+
+    required = [hook for hook in hooks if hook.required]
+    for hook in required:
+        if not hook.wait(deadline):
+            hook.cancel()
+            print(f"hook-dispatch: cancelled after {budget_ms}ms: {hook.command}", file=sys.stderr)
+
+    returncode = 0
+    for hook in required:
+        if hook.returncode < 0:
+            continue
+        sys.stderr.buffer.write(hook.output(hook.stderr))
+        if hook.returncode == 2:
+            returncode = 2
+        elif hook.returncode == 0:
+            sys.stdout.buffer.write(hook.output(hook.stdout))
+    return returncode
+
+
+def record_spans(event, hooks, names, payload, started, t0, returncode):
+    """Spans for the required hooks and an aggregate one for the dispatcher."""
+    import hookring
+
+    required = [hook for hook in hooks if hook.required]
+    spans = [{
+        "duration_ms": (hook.finished - t0) * 1000, "code": hook.returncode,
+        "bytes_out": hook.output_bytes(), "hook": names[i] if i < len(names) else hook.command,
+    } for i, hook in enumerate(required)]
+    # Its output is the required hooks' output again, so the report keeps it apart
+    spans.append({
+        "duration_ms": (time.perf_counter() - t0) * 1000, "code": returncode,
+        "bytes_out": sum(hook.output_bytes() for hook in required if hook.returncode == 0),
+        "hook": "hook-dispatch.py", "aggregate": True,
+    })
+    for span in spans:
+        span.update(started=started, bytes_in=len(payload), event=event)
+        hookring.try_record(span)
+
+
+def main():
+    args = parse_args()
+    payload = sys.stdin.buffer.read()
+    started = time.time()
+    t0 = time.perf_counter()
+    returncode = dispatch(args.hooks, payload, args.budget_ms)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if args.trace:
+        record_spans(args.trace, args.hooks, args.names, payload, started, t0, returncode)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
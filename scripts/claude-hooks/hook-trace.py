@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Trace hook runs into a fixed-size ring buffer and report on them.
+
+Usage:
+  python3 hook-trace.py run --event UserPromptSubmit --hook context-router-v2.py -- \\
+      'python3 ~/.claude/scripts/context-router-v2.py'
+  python3 hook-trace.py report [--since 24h] [--event E] [--instance A] [--top 10] [--json]
+
+`run` executes a hook command with the payload on stdin, passes its
+output and exit code through unchanged, and records one span: event,
+hook, start time, duration, bytes in/out, exit code and $CLAUDE_INSTANCE.
+It costs an extra interpreter, so the installer only uses it for hooks
+that run on their own; hook-client.py and hook-dispatch.py record the
+spans of the hooks they run themselves (--trace).
+
+Spans go to the ring buffer in hookring.py (~/.claude/metrics/hooks.ring).
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+# `run` sits in front of a hook, so what only `report` needs (json,
+# hooklib) is imported where it is used
+from hookring import CAPACITY, read_spans, ring_path, try_record
+
+# Rough size of a token in injected context, for the report only
+BYTES_PER_TOKEN = 4
+
+
+def run(args):
+    payload = sys.stdin.buffer.read()
+    started = time.time()
+    t0 = time.perf_counter()
+    result = subprocess.run(args.command, shell=True, input=payload, capture_output=True)
+    duration_ms = (time.perf_counter() - t0) * 1000
+
+    sys.stdout.buffer.write(result.stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(result.stderr)
+    sys.stderr.flush()
+
+    try_record({
+        "started": started, "duration_ms": duration_ms,
+        "bytes_in": len(payload), "bytes_out": len(result.stdout),
+        "code": result.returncode, "event": args.event, "hook": args.hook,
+    }, args.ring)
+    # A hook killed by a signal exits like the shell would report it
+    return result.returncode if result.returncode >= 0 else 128 - result.returncode
+
+
+def summarize(spans, top):
+    """Per-hook latency and output statistics, slowest (by p95) first.
+
+    Aggregate spans (hook-dispatch.py) are listed apart: their output is
+    the output of the hooks they ran, which is already counted.
+    """
+    hooks = [span for span in spans if not span["aggregate"]]
+    # Claude Code only injects stdout of hooks that exit 0
+    injected = [span for span in hooks if span["code"] == 0 and span["bytes_out"]]
+    largest = sorted(injected, key=lambda span: span["bytes_out"], reverse=True)[:top]
+    return {
+        "spans": len(spans), "capacity": CAPACITY,
+        "hooks": latency_rows(hooks),
+        "dispatch": latency_rows([span for span in spans if span["aggregate"]]),
+        "largest": largest,
+    }
+
+
+def latency_rows(spans):
+    from hooklib import percentile
+
+    groups = {}
+    for span in spans:
+        groups.setdefault((span["event"], span["hook"]), []).append(span)
+
+    rows = []
+    for (event, hook), runs in groups.items():
+        ms = [span["duration_ms"] for span in runs]
+        out = [span["bytes_out"] for span in runs]
+        rows.append({
+            "event": event,
+            "hook": hook,
+            "runs": len(runs),
+            "failures": sum(1 for span in runs if span["code"] not in (0, 2)),
+            "blocks": sum(1 for span in runs if span["code"] == 2),
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p95_ms": round(percentile(ms, 95), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+            "max_ms": round(max(ms), 3),
+            "mean_out": round(sum(out) / len(out)),
+            "max_out": max(out),
+        })
+    rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return rows
+
+
+def timestamp(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def print_rows(rows):
+    if not rows:
+        print("  (none)")
+        return
+    width = max(len(row["hook"]) for row in rows)
+    print(f"  {'Event':<16}  {'Hook':<{width}}  {'Runs':>5}  {'Fail':>4}  {'Block':>5}  "
+          f"{'p50':>9}  {'p95':>9}  {'p99':>9}  {'Max':>9}  {'Avg out':>8}")
+    for row in rows:
+        print(f"  {row['event']:<16}  {row['hook']:<{width}}  {row['runs']:>5}  "
+              f"{row['failures']:>4}  {row['blocks']:>5}  "
+              f"{row['p50_ms']:>7.1f}ms  {row['p95_ms']:>7.1f}ms  {row['p99_ms']:>7.1f}ms  "
+              f"{row['max_ms']:>7.1f}ms  {row['mean_out']:>7}B")
+
+
+def print_report(summary, spans):
+    if not spans:
+        print("No spans recorded. Install with: python3 setup-claude-hooks.py --trace")
+        return
+    print(f"{summary['spans']} spans (ring holds {summary['capacity']}), "
+          f"{timestamp(spans[0]['started'])} to {timestamp(spans[-1]['started'])}")
+
+    print("\nSlowest hooks (by p95):")
+    print_rows(summary["hooks"])
+    if summary["dispatch"]:
+        print("\nWhole events under hook-dispatch.py (what Claude Code waits for):")
+        print_rows(summary["dispatch"])
+
+    print("\nLargest context injections:")
+    if not summary["largest"]:
+        print("  (none)")
+    for span in summary["largest"]:
+        tokens = span["bytes_out"] // BYTES_PER_TOKEN
+        instance = f" [{span['instance']}]" if span["instance"] else ""
+        print(f"  {timestamp(span['started'])}  {span['event']:<16}  {span['hook']}{instance}  "
+              f"{span['bytes_out']}B (~{tokens} tokens)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Trace hook runs and report on them")
+    parser.add_argument("--ring", default=ring_path(), help="ring buffer file")
+    sub = parser.add_subparsers(dest="command_name", required=True)
+
+    run_parser = sub.add_parser("run", help="run a hook command and record a span")
+    run_parser.add_argument("--event", required=True, help="hook event, e.g. UserPromptSubmit")
+    run_parser.add_argument("--hook", required=True, help="name to report the hook under")
+    run_parser.add_argument("command", help="hook command, run through the shell")
+
+    report_parser = sub.add_parser("report", help="summarize recorded spans")
+    report_parser.add_argument("--since", help="only spans newer than this, e.g. 1h or 7d")
+    report_parser.add_argument("--event", help="only this hook event")
+    report_parser.add_argument("--instance", help="only this CLAUDE_INSTANCE")
+    report_parser.add_argument("--top", type=int, default=10, help="largest injections to list")
+    report_parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command_name == "run":
+        return run(args)
+
+    from hooklib import parse_duration
+
+    spans = read_spans(args.ring)
+    if args.since:
+        cutoff = time.time() - parse_duration(args.since)
+        spans = [span for span in spans if span["started"] >= cutoff]
+    if args.event:
+        spans = [span for span in spans if span["event"] == args.event]
+    if args.instance:
+        spans = [span for span in spans if span["instance"] == args.instance]
+
+    summary = summarize(spans, args.top)
+    if args.json:
+        import json
+
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary, spans)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
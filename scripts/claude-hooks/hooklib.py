@@ -0,0 +1,332 @@
+"""
+Shared helpers for the Claude Cognitive hook helpers.
+
+Installed next to the hook scripts in ~/.claude/scripts/ and imported by
+the helper scripts there. Every hook pays for this module's imports, so
+anything only some helpers need is imported inside the function using it.
+"""
+
+import json
+import os
+from pathlib import Path
+
+SOCKET_ENV = "CLAUDE_HOOK_SOCKET"
+
+
+def claude_dir():
+    return Path.home() / ".claude"
+
+
+def scripts_dir():
+    here = Path(__file__).resolve().parent
+    # Imported from hooks.pyz, __file__ points inside the archive
+    return here.parent if here.is_file() else here
+
+
+def project_root(root=None):
+    """Project a hook runs for: explicit root, $CLAUDE_PROJECT_DIR, or cwd."""
+    return Path(root or os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()).resolve()
+
+
+def socket_path():
+    """Unix socket the hook daemon listens on."""
+    return Path(os.environ.get(SOCKET_ENV) or claude_dir() / "run/hook-daemon.sock")
+
+
+def send_message(sock, message):
+    """Write one newline-delimited JSON message."""
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def recv_message(stream):
+    """Read one newline-delimited JSON message from a socket file, or None on EOF."""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# hook-client.py sends "run" requests as FRAME_MAGIC, a 4-byte little-endian
+# length and a marshalled dict, so it can skip importing json
+FRAME_MAGIC = b"M"
+
+
+def send_frame(sock, message):
+    import marshal
+
+    body = marshal.dumps(message)
+    sock.sendall(FRAME_MAGIC + len(body).to_bytes(4, "little") + body)
+
+
+def recv_frame(stream):
+    """Read one marshal frame from a socket file, or None on EOF."""
+    import marshal
+
+    header = stream.read(5)
+    if len(header) < 5 or header[:1] != FRAME_MAGIC:
+        return None
+    return marshal.loads(stream.read(int.from_bytes(header[1:], "little")))
+
+
+def connect_daemon(timeout=None):
+    """Socket connected to hook-daemon.py, or None when it is not running."""
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path()))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def publish(topic, messages):
+    """Push messages to the daemon's subscribers of topic; False if nobody could be reached."""
+    sock = connect_daemon(timeout=1)
+    if sock is None:
+        return False
+    try:
+        with sock, sock.makefile("rb") as stream:
+            send_message(sock, {"op": "publish", "topic": topic, "messages": messages})
+            reply = recv_message(stream)
+    except (OSError, ValueError):
+        return False
+    return bool(reply and reply.get("ok"))
+
+
+def subscribe(topic):
+    """Iterator over messages published to topic, or None when the daemon is not running."""
+    sock = connect_daemon()
+    if sock is None:
+        return None
+    send_message(sock, {"op": "subscribe", "topic": topic})
+
+    def messages():
+        with sock, sock.makefile("rb") as stream:
+            while True:
+                message = recv_message(stream)
+                if message is None:
+                    return
+                if "ok" not in message:
+                    yield message
+
+    return messages()
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(text):
+    """Seconds in a duration like "90s", "30m", "1h", "7d" or "2w"."""
+    import re
+
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw])", text.strip())
+    if not match:
+        raise ValueError(f"invalid duration: {text!r} (expected e.g. 30m, 1h, 7d)")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def entry_timestamp(entry):
+    """Unix timestamp of a pool entry; accepts epoch seconds/ms or ISO 8601."""
+    value = entry.get("timestamp") if isinstance(entry, dict) else None
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e12 else float(value)
+    if isinstance(value, str):
+        from datetime import datetime
+
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+class RenderCache:
+    """Content-addressed cache of rendered context blocks with LRU eviction.
+
+    Keys are hashes of whatever the block depends on (store version,
+    arguments, format version), so an unchanged state returns the exact
+    bytes injected last time. Entries live in memory, which persists inside
+    hook-daemon.py, and on disk for per-process hooks. Disk entries are
+    evicted oldest-used first once max_entries or max_bytes is exceeded;
+    blocks larger than max_bytes are not cached at all.
+
+    Counters are appended to a `counts` file as one byte per event under a
+    shared flock, so a hit costs one small write and concurrent hooks never
+    lose counts. Once the file passes COUNTS_FOLD bytes, a miss folds it
+    into stats.json under an exclusive flock.
+    """
+
+    COUNTERS = {"hits": b"h", "misses": b"m", "evictions": b"e"}
+    COUNTS_FOLD = 64 * 1024
+
+    def __init__(self, directory, max_entries=64, max_bytes=1024 * 1024):
+        from collections import OrderedDict
+
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+
+    @staticmethod
+    def key(*parts):
+        import hashlib
+
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def get_or_render(self, parts, render):
+        key = self.key(*parts)
+        text = self.lookup(key)
+        if text is not None:
+            self.count("hits")
+            return text
+        text = render()
+        self.store(key, text)
+        if self.count("misses") > self.COUNTS_FOLD:
+            self.fold_counts()
+        return text
+
+    def lookup(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            # Eviction goes by the files' mtimes, so a memory hit marks the file used too
+            try:
+                os.utime(self.directory / f"{key}.txt")
+            except OSError:
+                pass
+            return self.memory[key]
+        path = self.directory / f"{key}.txt"
+        try:
+            text = path.read_bytes().decode()
+            os.utime(path)
+        except OSError:
+            return None
+        self.remember(key, text)
+        return text
+
+    def remember(self, key, text):
+        self.memory[key] = text
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def store(self, key, text):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = text.encode()
+        if len(data) > self.max_bytes:
+            # Storing it would evict every other block, and then itself
+            return
+        self.remember(key, text)
+        path = self.directory / f"{key}.txt"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.directory.glob("*.txt"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            self.memory.pop(path.stem, None)
+            total -= size
+            evicted += 1
+        if evicted:
+            self.count("evictions", evicted)
+
+    def count(self, name, n=1):
+        """Record n events; return the size of the counts file (0 if it could not be written)."""
+        import fcntl
+
+        try:
+            fd = os.open(self.directory / "counts", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except OSError:
+            return 0
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            os.write(fd, self.COUNTERS[name] * n)
+            return os.fstat(fd).st_size
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+
+    def fold_counts(self):
+        """Move the events in the counts file into stats.json."""
+        import fcntl
+
+        with open(self.directory / "counts", "r+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            totals = self.totals(f.read())
+            tmp = self.directory / f"stats.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(totals))
+            os.replace(tmp, self.directory / "stats.json")
+            f.truncate(0)
+
+    def load_stats(self):
+        import fcntl
+
+        try:
+            f = open(self.directory / "counts", "rb")
+        except FileNotFoundError:
+            return self.totals(b"")
+        with f:
+            # Shared lock: a fold moves counts into stats.json as one step
+            fcntl.flock(f, fcntl.LOCK_SH)
+            return self.totals(f.read())
+
+    def totals(self, counts):
+        """Counters in stats.json plus the events in counts (not folded in yet)."""
+        try:
+            saved = json.loads((self.directory / "stats.json").read_text())
+        except (OSError, ValueError):
+            saved = {}
+        return {name: saved.get(name, 0) + counts.count(code) for name, code in self.COUNTERS.items()}
+
+
+_render_caches = {}
+
+
+def render_cache(directory, **limits):
+    """The RenderCache for a directory, shared across runs inside the daemon."""
+    key = str(Path(directory).resolve())
+    if key not in _render_caches:
+        _render_caches[key] = RenderCache(directory, **limits)
+    return _render_caches[key]
+
+
+def render_cache_stats():
+    """Counters of each cache used in this process."""
+    return {directory: cache.load_stats() for directory, cache in _render_caches.items()}
+
+
+def parse_importtime(stderr):
+    """Total microseconds spent in top-level imports, from python -X importtime output."""
+    import re
+
+    total = 0
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\S.*)", line)
+        if match:
+            total += int(match.group(1))
+    return total
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    import math
+
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
@@ -0,0 +1,110 @@
+"""
+Fixed-size, memory-mapped ring buffer of hook spans.
+
+Shared by the processes that already sit around a hook (hook-client.py,
+hook-dispatch.py, hook-trace.py's wrapper) and by `hook-trace.py report`.
+Recording a span is on the hook's critical path, so this module imports
+only builtin extension modules, not hooklib.
+
+The ring is ~/.claude/metrics/hooks.ring: a header and CAPACITY slots,
+each one packed SLOT struct. Writers take an exclusive flock, so
+concurrent hooks and instances can share it. Once the ring is full, each
+new span overwrites the oldest, so the file never grows.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+
+MAGIC = b"HKRING02"
+HEADER = struct.Struct("<8sIIQ")  # magic, slot size, capacity, spans written
+HEADER_BYTES = 64
+# sequence (1-based, 0 = empty), started, duration ms, bytes in, bytes out,
+# exit code, flags, event, hook, instance
+SLOT = struct.Struct("<QddIIiB24s64s16s")
+# The span covers other recorded spans (hook-dispatch.py), not a hook of its own
+FLAG_AGGREGATE = 1
+CAPACITY = 4096
+RING_BYTES = HEADER_BYTES + CAPACITY * SLOT.size
+
+
+def ring_path():
+    return os.path.expanduser("~/.claude/metrics/hooks.ring")
+
+
+def text_field(value, size):
+    return value.encode("utf-8", "replace")[:size]
+
+
+def read_field(raw):
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+
+def open_ring(path):
+    """File descriptor of the ring, created or reset if missing or of another layout."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    header = os.pread(fd, HEADER.size, 0)
+    if os.fstat(fd).st_size != RING_BYTES or header[:8] != MAGIC:
+        os.ftruncate(fd, 0)
+        os.ftruncate(fd, RING_BYTES)
+        os.pwrite(fd, HEADER.pack(MAGIC, SLOT.size, CAPACITY, 0), 0)
+    return fd
+
+
+def record(span, path=None):
+    """Write span into the next slot, overwriting the oldest once the ring is full."""
+    fd = open_ring(path or ring_path())
+    try:
+        with mmap.mmap(fd, RING_BYTES) as ring:
+            _, _, capacity, written = HEADER.unpack_from(ring)
+            SLOT.pack_into(
+                ring, HEADER_BYTES + (written % capacity) * SLOT.size,
+                written + 1, span["started"], span["duration_ms"],
+                span["bytes_in"], span["bytes_out"], span["code"],
+                FLAG_AGGREGATE if span.get("aggregate") else 0,
+                text_field(span["event"], 24), text_field(span["hook"], 64),
+                text_field(span.get("instance") or os.environ.get("CLAUDE_INSTANCE", ""), 16),
+            )
+            HEADER.pack_into(ring, 0, MAGIC, SLOT.size, capacity, written + 1)
+    finally:
+        os.close(fd)
+
+
+def try_record(span, path=None):
+    """record(), reporting failures on stderr: tracing must never break the hook it wraps."""
+    try:
+        record(span, path)
+    except OSError as e:
+        os.write(2, f"hook trace: could not record span: {e}\n".encode())
+
+
+def read_spans(path=None):
+    """Spans in the ring, oldest first."""
+    try:
+        f = open(path or ring_path(), "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        fcntl.flock(f, fcntl.LOCK_SH)
+        if os.fstat(f.fileno()).st_size != RING_BYTES:
+            return []
+        with mmap.mmap(f.fileno(), RING_BYTES, access=mmap.ACCESS_READ) as ring:
+            magic, slot_size, capacity, _ = HEADER.unpack_from(ring)
+            if magic != MAGIC or slot_size != SLOT.size:
+                return []
+            spans = []
+            for slot in range(capacity):
+                seq, started, duration_ms, bytes_in, bytes_out, code, flags, event, hook, instance = \
+                    SLOT.unpack_from(ring, HEADER_BYTES + slot * SLOT.size)
+                if seq:
+                    spans.append({
+                        "seq": seq, "started": started, "duration_ms": duration_ms,
+                        "bytes_in": bytes_in, "bytes_out": bytes_out, "code": code,
+                        "event": read_field(event), "hook": read_field(hook),
+                        "instance": read_field(instance), "aggregate": bool(flags & FLAG_AGGREGATE),
+                    })
+    spans.sort(key=lambda span: span["seq"])
+    return spans
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Append-only, time-indexed store for Claude Cognitive pool entries.
+
+Two backends, both under .claude/pool/store/:
+  segments  numbered JSONL segments, each with a sparse index of
+            (timestamp, byte offset) samples, so a --since query seeks
+            straight to the tail it needs (default)
+  sqlite    one pool.db in WAL mode, indexed on timestamp; instances read
+            without blocking each other or the writer
+
+Usage:
+  python3 pool-store.py sync                   # ingest new lines from instance_state.jsonl
+  python3 pool-store.py append < entry.json    # append entries (one JSON object per line)
+  python3 pool-store.py query --since 1h       # entries from the last hour
+  python3 pool-store.py load                   # SessionStart: render recent entries
+  python3 pool-store.py compact --retain 30d   # drop entries older than 30 days
+  python3 pool-store.py cache-stats            # render cache hits/misses
+  python3 pool-store.py watch                  # print new entries as they arrive
+  python3 pool-store.py --backend sqlite ...   # use the SQLite backend
+
+Writers serialize (a lock file, or BEGIN IMMEDIATE); readers never lock.
+Rendered output is cached by store version, so an unchanged pool prints
+identical bytes. New entries are pushed to `watch` through hook-daemon.py.
+"""
+
+import argparse
+import bisect
+import fcntl
+import json
+import os
+import sqlite3
+import struct
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from hooklib import (
+    entry_timestamp, parse_duration, project_root, publish, render_cache, subscribe,
+)
+
+STORE_DIR = ".claude/pool/store"
+SOURCE_FILE = ".claude/pool/instance_state.jsonl"
+SEGMENT_BYTES = 4 * 1024 * 1024
+INDEX_EVERY = 64
+DEFAULT_RETENTION = "30d"
+COMPACT_EVERY = 86400
+# Bump when format_entry changes so cached blocks are not reused
+RENDER_FORMAT = 1
+# --since cutoffs are aligned to 1/CUTOFF_STEPS of the window (at least
+# CUTOFF_STEP seconds) so repeated calls share a cache key
+CUTOFF_STEP = 60
+CUTOFF_STEPS = 100
+
+# Larger batches (e.g. a first import) are announced as a resync instead
+PUBLISH_MAX = 100
+
+# timestamp, byte offset of the record it belongs to
+INDEX_SAMPLE = struct.Struct("<dQ")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, ts REAL NOT NULL, body TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def empty_state():
+    return {"version": 0, "ingest": {"offset": 0, "inode": None}, "compacted_at": 0}
+
+
+class PoolStore:
+    """Ingest and publish logic shared by the backends.
+
+    Subclasses keep `state` (version, ingest checkpoint, compacted_at) and
+    implement writer(), write_state(), write(), since(), compact(), newest()
+    and is_empty().
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dir = root / STORE_DIR
+        self.appended = []
+
+    def append(self, entries):
+        """Append entries (caller holds the writer lock); return how many were written."""
+        return self.write(self.record(entries))
+
+    def record(self, entries):
+        for entry in entries:
+            if entry_timestamp(entry) is None:
+                # Stamped with the time it was stored, so both backends
+                # filter and compact it the same way
+                entry = {**entry, "timestamp": time.time()}
+            if len(self.appended) <= PUBLISH_MAX:
+                self.appended.append(entry)
+            yield entry
+
+    def publish(self):
+        """Push entries appended by the last committed write to watchers."""
+        if not self.appended:
+            return
+        if len(self.appended) > PUBLISH_MAX:
+            messages = [{"resync": True}]
+        else:
+            messages = [{"entry": entry} for entry in self.appended]
+        publish(pool_topic(self.root), messages)
+        self.appended = []
+
+    def sync(self, source):
+        """Ingest complete lines appended to source since the last sync."""
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            return 0
+        ingest = self.state["ingest"]
+        offset = ingest["offset"]
+        if ingest["inode"] != st.st_ino or st.st_size < offset:
+            # Source was replaced or truncated: reread it, skipping what we have
+            offset = 0
+        if st.st_size == offset:
+            return 0
+
+        newest = self.newest()
+        skip_old = offset == 0 and ingest["inode"] is not None
+
+        def entries():
+            nonlocal offset
+            with open(source, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if skip_old and (entry_timestamp(entry) or 0) <= newest:
+                        continue
+                    yield entry
+
+        written = self.append(entries())
+        self.state["ingest"] = {"offset": offset, "inode": st.st_ino}
+        return written
+
+
+class SegmentStore(PoolStore):
+    """Segments plus state.json: segment list, ingest checkpoint, version."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.state_file = self.dir / "state.json"
+        self.state = self.read_state()
+
+    def read_state(self):
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {**empty_state(), "segments": []}
+
+    def write_state(self):
+        self.state["version"] += 1
+        tmp = self.state_file.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, self.state_file)
+
+    @contextmanager
+    def writer(self):
+        """Exclusive writer lock; reloads state so concurrent writers serialize."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with open(self.dir / "lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.state = self.read_state()
+            self.discard_uncommitted()
+            yield self
+
+    def discard_uncommitted(self):
+        """Cut the open segment back to what state.json records.
+
+        A writer that died between appending and saving state leaves bytes
+        that the ingest checkpoint does not cover; they would be ingested twice.
+        """
+        if not self.state["segments"]:
+            return
+        segment = self.state["segments"][-1]
+        samples = -(-segment["count"] // INDEX_EVERY)
+        for path, size in ((self.segment_path(segment["seq"]), segment["bytes"]),
+                           (self.segment_path(segment["seq"], ".idx"), samples * INDEX_SAMPLE.size)):
+            try:
+                if path.stat().st_size > size:
+                    os.truncate(path, size)
+            except FileNotFoundError:
+                pass
+
+    def segment_path(self, seq, suffix=".seg"):
+        return self.dir / f"{seq:08d}{suffix}"
+
+    def write_record(self, segment, entry, data, index):
+        ts = entry_timestamp(entry)
+        if ts is None:
+            ts = time.time()
+        if segment["count"] == 0:
+            segment["first_ts"] = segment["last_ts"] = ts
+        # The oldest entry, not the first: compaction rewrites from it
+        segment["first_ts"] = min(segment["first_ts"], ts)
+        # The index key never goes backwards, so entries that arrive late
+        # are indexed at the newest time seen; queries filter on the real one.
+        key = max(ts, segment["last_ts"])
+        line = json.dumps(entry, separators=(",", ":")).encode() + b"\n"
+        data.write(line)
+        if segment["count"] % INDEX_EVERY == 0:
+            index.write(INDEX_SAMPLE.pack(key, segment["bytes"]))
+        segment["last_ts"] = key
+        segment["count"] += 1
+        segment["bytes"] += len(line)
+
+    def newest(self):
+        return self.state["segments"][-1]["last_ts"] if self.state["segments"] else 0
+
+    def is_empty(self):
+        return not self.state["segments"]
+
+    def write(self, entries):
+        segments = self.state["segments"]
+        written = 0
+        data = index = None
+        try:
+            for entry in entries:
+                if not segments or segments[-1]["bytes"] >= SEGMENT_BYTES:
+                    seq = segments[-1]["seq"] + 1 if segments else 1
+                    segments.append({"seq": seq, "first_ts": 0, "last_ts": 0, "count": 0, "bytes": 0})
+                    if data:
+                        data.close()
+                        index.close()
+                        data = None
+                if data is None:
+                    data = open(self.segment_path(segments[-1]["seq"]), "ab")
+                    index = open(self.segment_path(segments[-1]["seq"], ".idx"), "ab")
+                self.write_record(segments[-1], entry, data, index)
+                written += 1
+        finally:
+            if data:
+                data.close()
+                index.close()
+        return written
+
+    def since(self, cutoff):
+        """Entries with timestamp >= cutoff, oldest first, reading only the tail."""
+        for segment in self.state["segments"]:
+            if segment["last_ts"] >= cutoff:
+                yield from self.read_segment(segment, cutoff)
+
+    def read_segment(self, segment, cutoff):
+        start = self.seek_offset(segment["seq"], cutoff)
+        try:
+            f = open(self.segment_path(segment["seq"]), "rb")
+        except FileNotFoundError:
+            # Removed by a concurrent compaction
+            return
+        with f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Offset taken from an index that compaction just replaced
+                    continue
+                if (entry_timestamp(entry) or 0) >= cutoff:
+                    yield entry
+
+    def seek_offset(self, seq, cutoff):
+        """Offset of the last index sample before cutoff (0 if none)."""
+        try:
+            data = self.segment_path(seq, ".idx").read_bytes()
+        except FileNotFoundError:
+            return 0
+        samples = [INDEX_SAMPLE.unpack_from(data, i)
+                   for i in range(0, len(data) - len(data) % INDEX_SAMPLE.size, INDEX_SAMPLE.size)]
+        i = bisect.bisect_left([ts for ts, _ in samples], cutoff)
+        return samples[i - 1][1] if i else 0
+
+    def compact(self, retain_seconds, now=None):
+        """Drop entries older than the retention window (caller holds the writer lock)."""
+        now = now or time.time()
+        cutoff = now - retain_seconds
+        kept, removed = [], 0
+        for segment in self.state["segments"]:
+            if segment["last_ts"] < cutoff:
+                removed += segment["count"]
+                self.segment_path(segment["seq"]).unlink(missing_ok=True)
+                self.segment_path(segment["seq"], ".idx").unlink(missing_ok=True)
+            elif segment["first_ts"] < cutoff:
+                removed += self.rewrite(segment, cutoff)
+                kept.append(segment)
+            else:
+                kept.append(segment)
+        self.state["segments"] = kept
+        self.state["compacted_at"] = now
+        return removed
+
+    def rewrite(self, segment, cutoff):
+        """Rewrite a segment keeping entries newer than cutoff; return how many were dropped."""
+        entries = list(self.read_segment(segment, cutoff))
+        dropped = segment["count"] - len(entries)
+        segment.update(first_ts=0, last_ts=0, count=0, bytes=0)
+        data_path = self.segment_path(segment["seq"])
+        index_path = self.segment_path(segment["seq"], ".idx")
+        with open(data_path.with_suffix(".tmp"), "wb") as data, \
+                open(index_path.with_suffix(".idxtmp"), "wb") as index:
+            for entry in entries:
+                self.write_record(segment, entry, data, index)
+        os.replace(index_path.with_suffix(".idxtmp"), index_path)
+        os.replace(data_path.with_suffix(".tmp"), data_path)
+        return dropped
+
+
+class SqliteStore(PoolStore):
+    """All entries in one SQLite database in WAL mode, indexed on timestamp."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.dir / "pool.db", timeout=10, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SQLITE_SCHEMA)
+        self.state = self.read_state()
+
+    def read_state(self):
+        state = empty_state()
+        for key, value in self.db.execute("SELECT key, value FROM meta"):
+            state[key] = json.loads(value)
+        return state
+
+    def write_state(self):
+        self.state["version"] += 1
+        self.db.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [(key, json.dumps(value)) for key, value in self.state.items()],
+        )
+
+    @contextmanager
+    def writer(self):
+        """One write transaction; BEGIN IMMEDIATE serializes writers, not readers."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.state = self.read_state()
+            yield self
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def newest(self):
+        return self.db.execute("SELECT COALESCE(MAX(ts), 0) FROM entries").fetchone()[0]
+
+    def is_empty(self):
+        return self.db.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+
+    def write(self, entries):
+        rows = ((entry_timestamp(entry), json.dumps(entry, separators=(",", ":")))
+                for entry in entries)
+        return self.db.executemany("INSERT INTO entries (ts, body) VALUES (?, ?)", rows).rowcount
+
+    def since(self, cutoff):
+        rows = self.db.execute("SELECT body FROM entries WHERE ts >= ? ORDER BY ts, id", (cutoff,))
+        for (body,) in rows:
+            yield json.loads(body)
+
+    def compact(self, retain_seconds, now=None):
+        now = now or time.time()
+        removed = self.db.execute("DELETE FROM entries WHERE ts < ?", (now - retain_seconds,)).rowcount
+        self.state["compacted_at"] = now
+        return removed
+
+
+BACKENDS = {"segments": SegmentStore, "sqlite": SqliteStore}
+
+
+def pool_topic(root):
+    return f"pool:{root}"
+
+
+def source_path(root, source=None):
+    return root / (source or SOURCE_FILE)
+
+
+def compaction_due(store):
+    return time.time() - store.state["compacted_at"] > COMPACT_EVERY and not store.is_empty()
+
+
+def sync_pending(store, source):
+    """Whether source has changed since the last sync (checked without locking)."""
+    ingest = store.state["ingest"]
+    try:
+        st = os.stat(source)
+    except FileNotFoundError:
+        return False
+    return st.st_ino != ingest["inode"] or st.st_size != ingest["offset"]
+
+
+def refresh(store, source, compact=True):
+    """Sync from the source file and compact when due; return entries ingested.
+
+    Takes no lock and saves no state if neither is needed, so syncing after
+    every prompt neither contends with other instances nor bumps the
+    version (which would invalidate every cached render).
+    """
+    due = compact and compaction_due(store)
+    if not sync_pending(store, source) and not due:
+        return 0
+    with store.writer():
+        checkpoint = dict(store.state["ingest"])
+        written = store.sync(source)
+        changed = store.state["ingest"] != checkpoint
+        if compact and compaction_due(store):
+            store.compact(parse_duration(DEFAULT_RETENTION))
+            changed = True
+        if changed:
+            store.write_state()
+    store.publish()
+    return written
+
+
+def format_entry(entry):
+    ts = entry_timestamp(entry)
+    when = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M") if ts else "unknown time"
+    instance = entry.get("source_instance", "?")
+    action = entry.get("action", "update")
+    topic = entry.get("topic", "")
+    summary = entry.get("summary", "")
+    text = f"{topic}: {summary}" if topic and summary else topic or summary
+    return f"- [{instance}] {when} {action}: {text}"
+
+
+def render_query(store, cutoff, instance, as_json):
+    lines = []
+    for entry in store.since(cutoff):
+        if instance and entry.get("source_instance") != instance:
+            continue
+        lines.append(json.dumps(entry) if as_json else format_entry(entry))
+    if not lines and not as_json:
+        lines.append("No entries found")
+    return "".join(line + "\n" for line in lines)
+
+
+def render_load(store, cutoff, since, limit):
+    recent = list(store.since(cutoff))[-limit:]
+    if not recent:
+        return ""
+    lines = [f"## Pool activity (last {since}, {len(recent)} entries)"]
+    lines.extend(format_entry(entry) for entry in recent)
+    return "".join(line + "\n" for line in lines)
+
+
+def watch(root, instance):
+    messages = subscribe(pool_topic(root))
+    if messages is None:
+        print("pool-store: watch needs hook-daemon.py running", file=sys.stderr)
+        return 1
+    try:
+        for message in messages:
+            if message.get("resync"):
+                print("- (many entries added, run `pool-store.py query` to see them)", flush=True)
+                continue
+            entry = message["entry"]
+            if not instance or entry.get("source_instance") == instance:
+                print(format_entry(entry), flush=True)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Append-only pool entry store")
+    parser.add_argument("--root", help="project directory (default: $CLAUDE_PROJECT_DIR or cwd)")
+    parser.add_argument("--source", help=f"pool file to ingest (default: {SOURCE_FILE})")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="segments")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sync = sub.add_parser("sync", help="ingest new entries from the pool file")
+    sync.add_argument("--quiet", action="store_true", help="print nothing (for hooks)")
+    sub.add_parser("append", help="append JSON entries from stdin")
+    query = sub.add_parser("query", help="print entries newer than --since")
+    query.add_argument("--since", default="1h")
+    query.add_argument("--instance", help="only entries from this instance")
+    query.add_argument("--json", action="store_true", help="print raw JSON lines")
+    load = sub.add_parser("load", help="render recent entries for SessionStart")
+    load.add_argument("--since", default="24h")
+    load.add_argument("--limit", type=int, default=50)
+    compact = sub.add_parser("compact", help="drop entries outside the retention window")
+    compact.add_argument("--retain", default=DEFAULT_RETENTION)
+    sub.add_parser("cache-stats", help="print render cache hit/miss counters")
+    watch = sub.add_parser("watch", help="print new entries as they are pushed (needs hook-daemon.py)")
+    watch.add_argument("--instance", help="only entries from this instance")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    root = project_root(args.root)
+    store = BACKENDS[args.backend](root)
+    source = source_path(root, args.source)
+
+    if args.command == "sync":
+        written = refresh(store, source, compact=False)
+        if not args.quiet:
+            print(f"✓ Ingested {written} entries")
+        return 0
+
+    if args.command == "watch":
+        return watch(root, args.instance)
+
+    if args.command == "append":
+        entries = (json.loads(line) for line in sys.stdin if line.strip())
+        with store.writer():
+            written = store.append(entries)
+            store.write_state()
+        store.publish()
+        print(f"✓ Appended {written} entries")
+        return 0
+
+    if args.command == "compact":
+        with store.writer():
+            removed = store.compact(parse_duration(args.retain))
+            store.write_state()
+        print(f"✓ Removed {removed} entries older than {args.retain}")
+        return 0
+
+    cache = render_cache(store.dir / "render-cache")
+    if args.command == "cache-stats":
+        print(json.dumps(cache.load_stats()))
+        return 0
+
+    refresh(store, source)
+    window = parse_duration(args.since)
+    cutoff = time.time() - window
+    cutoff -= cutoff % max(CUTOFF_STEP, window // CUTOFF_STEPS)
+    version = store.state["version"]
+
+    if args.command == "query":
+        parts = ("query", RENDER_FORMAT, args.backend, version, cutoff, args.instance, args.json)
+        text = cache.get_or_render(parts, lambda: render_query(store, cutoff, args.instance, args.json))
+    else:
+        parts = ("load", RENDER_FORMAT, args.backend, version, cutoff, args.since, args.limit)
+        text = cache.get_or_render(parts, lambda: render_load(store, cutoff, args.since, args.limit))
+    sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
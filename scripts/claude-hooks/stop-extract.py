@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Incremental Stop hook: feed pool-extractor.py only the new transcript turns.
+
+Usage (from settings.json):
+  python3 ~/.claude/scripts/stop-extract.py
+
+Keeps a byte-offset checkpoint per session in .claude/pool/checkpoints/.
+On each Stop it streams the JSONL records appended since the checkpoint
+into a delta transcript, runs the extractor with transcript_path pointing
+at that delta, and advances the checkpoint only if the extractor succeeds.
+Memory stays bounded by one record, not by the session length.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from hooklib import project_root, scripts_dir
+
+CHECKPOINT_DIR = ".claude/pool/checkpoints"
+CONVERSATION_TYPES = {"user", "assistant"}
+
+
+def new_lines(path, offset):
+    """Yield (line, end offset) for complete lines after offset."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Still being written; pick it up next time
+                return
+            offset += len(line)
+            yield line, offset
+
+
+def parse_records(lines):
+    for line, offset in lines:
+        try:
+            yield json.loads(line), line, offset
+        except ValueError:
+            yield None, line, offset
+
+
+def conversation(records):
+    """Keep user/assistant turns; other records only advance the offset."""
+    for record, line, offset in records:
+        keep = isinstance(record, dict) and record.get("type") in CONVERSATION_TYPES
+        yield (line if keep else None), offset
+
+
+def checkpoint_path(root, session_id):
+    safe = re.sub(r"[^\w.-]", "_", session_id)
+    return root / CHECKPOINT_DIR / f"{safe}.json"
+
+
+def load_checkpoint(path, transcript):
+    """Offset to resume from, or 0 if the transcript was replaced or truncated."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    st = os.stat(transcript)
+    if checkpoint.get("inode") != st.st_ino or checkpoint.get("offset", 0) > st.st_size:
+        return 0
+    return checkpoint["offset"]
+
+
+def save_checkpoint(path, transcript, offset):
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"inode": os.stat(transcript).st_ino, "offset": offset}, f)
+    os.replace(tmp, path)
+
+
+def write_delta(transcript, offset, delta_path):
+    """Stream new turns into delta_path; return (turns written, new offset)."""
+    written = 0
+    with open(delta_path, "wb") as delta:
+        for line, offset_after in conversation(parse_records(new_lines(transcript, offset))):
+            offset = offset_after
+            if line is not None:
+                delta.write(line)
+                written += 1
+    return written, offset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incremental Stop hook for pool-extractor.py")
+    parser.add_argument("--extractor", default=str(scripts_dir() / "pool-extractor.py"),
+                        help="extractor script to run on the new turns")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    payload = json.load(sys.stdin)
+    transcript = payload.get("transcript_path")
+    if not transcript or not os.path.exists(transcript):
+        return 0
+
+    root = project_root()
+    checkpoint = checkpoint_path(root, payload.get("session_id", "default"))
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+    offset = load_checkpoint(checkpoint, transcript)
+
+    delta_path = checkpoint.with_suffix(".delta.jsonl")
+    turns, new_offset = write_delta(transcript, offset, delta_path)
+    if not turns:
+        if new_offset != offset:
+            save_checkpoint(checkpoint, transcript, new_offset)
+        delta_path.unlink(missing_ok=True)
+        return 0
+
+    result = subprocess.run(
+        [sys.executable, args.extractor],
+        input=json.dumps({**payload, "transcript_path": str(delta_path)}).encode(),
+        capture_output=True,
+    )
+    sys.stdout.write(result.stdout.decode("utf-8", "replace"))
+    sys.stderr.write(result.stderr.decode("utf-8", "replace"))
+    if result.returncode == 0:
+        save_checkpoint(checkpoint, transcript, new_offset)
+    delta_path.unlink(missing_ok=True)
+    return result.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
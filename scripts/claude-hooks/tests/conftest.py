@@ -0,0 +1,23 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+HELPERS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(HELPERS))
+
+
+def load_script(filename):
+    """Import a hyphenated helper script (e.g. pool-store.py) as a module."""
+    name = filename[:-3].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, HELPERS / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(tmp_path, monkeypatch):
+    """Keep tests away from a hook-daemon.py that may be running on this machine."""
+    monkeypatch.setenv("CLAUDE_HOOK_SOCKET", str(tmp_path / "no-daemon.sock"))
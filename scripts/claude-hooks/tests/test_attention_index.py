@@ -0,0 +1,120 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import load_script
+
+attention_index = load_script("attention-index.py")
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+FILES = {
+    "package.json": '{"name": "root"}',
+    "packages/blog/package.json": '{"name": "@site/blog"}',
+    "packages/blog/src/PostList.tsx": "export function PostList() {}\nexport const PAGE_SIZE = 10\n",
+    "packages/blog/src/utils/reading-time.ts": "export default function readingTime() {}\n",
+    "apps/web/app/page.tsx": "export default async function Page() {}\n",
+    "scripts/tool.py": "def rebuild_cache():\n    pass\n\nclass Loader:\n    pass\n",
+    ".claude/modules/blog.md": "# Blog Pipeline\n\n## Pagination\n",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for path, text in FILES.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(text)
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / ".gitignore").write_text(".claude/\n")
+    return tmp_path
+
+
+def open_index(root):
+    return attention_index.AttentionIndex(root / attention_index.INDEX_DIR / "index.bin")
+
+
+def paths_for(index, key):
+    return sorted(index.path(i) for i in index.postings(key))
+
+
+def test_index_maps_keys_to_files(repo):
+    generation, files, keys, reindexed = attention_index.build(repo)
+    assert (generation, reindexed) == (1, files)
+    # Gitignored .claude docs are indexed too
+    assert files == len(FILES) + 1
+
+    index = open_index(repo)
+    try:
+        assert index.nfiles == files and index.nkeys == keys
+        assert paths_for(index, "postlist") == ["packages/blog/src/PostList.tsx"]
+        assert paths_for(index, "page_size") == ["packages/blog/src/PostList.tsx"]
+        assert paths_for(index, "rebuild_cache") == ["scripts/tool.py"]
+        assert paths_for(index, "utils/reading-time.ts") == ["packages/blog/src/utils/reading-time.ts"]
+        assert paths_for(index, "pagination") == [".claude/modules/blog.md"]
+        assert "packages/blog/src/utils/reading-time.ts" in paths_for(index, "@site/blog")
+        assert index.postings("no-such-key") == ()
+        assert index.postings("") == ()
+        assert index.postings("zzzz") == ()
+    finally:
+        index.close()
+
+
+def test_postings_agree_with_a_linear_scan(repo):
+    attention_index.build(repo)
+    index = open_index(repo)
+    try:
+        for i in range(index.nkeys):
+            key, _, count = index._key(i)
+            assert len(index.postings(key.decode())) == count
+            if i:
+                assert index._key(i - 1)[0] < key
+    finally:
+        index.close()
+
+
+def test_match_prefers_rare_keys(repo):
+    attention_index.build(repo)
+    index = open_index(repo)
+    try:
+        best, _ = index.match("why does PostList render twice in packages/blog?")[0]
+    finally:
+        index.close()
+    assert best == "packages/blog/src/PostList.tsx"
+
+
+def test_build_is_incremental(repo):
+    attention_index.build(repo)
+    generation, files, keys, reindexed = attention_index.build(repo)
+    assert (generation, keys, reindexed) == (1, None, 0)
+
+    path = repo / "packages/blog/src/PostList.tsx"
+    path.write_text("export function PostGrid() {}\n")
+    generation, files, keys, reindexed = attention_index.build(repo)
+    assert (generation, reindexed) == (2, 1)
+    (repo / "apps/web/app/page.tsx").unlink()
+    generation, files, keys, reindexed = attention_index.build(repo)
+    assert (generation, files, reindexed) == (3, len(FILES), 0)
+
+    index = open_index(repo)
+    try:
+        assert index.generation == 3
+        assert paths_for(index, "page_size") == []
+        assert paths_for(index, "postgrid") == ["packages/blog/src/PostList.tsx"]
+        assert paths_for(index, "page.tsx") == []
+    finally:
+        index.close()
+
+
+def test_build_skips_directories_outside_git(tmp_path):
+    (tmp_path / "file.py").write_text("def f():\n    pass\n")
+    assert attention_index.build(tmp_path) is None
+    assert not (tmp_path / attention_index.INDEX_DIR).exists()
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "index.bin"
+    path.write_bytes(os.urandom(attention_index.HEADER.size))
+    with pytest.raises(ValueError):
+        attention_index.AttentionIndex(path)
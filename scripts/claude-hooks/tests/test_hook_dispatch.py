@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import time
+
+from conftest import HELPERS
+
+
+def dispatch(*hooks, budget_ms=2000):
+    argv = [sys.executable, str(HELPERS / "hook-dispatch.py"), "--budget-ms", str(budget_ms)]
+    for flag, command in hooks:
+        argv += [f"--{flag}", command]
+    return subprocess.run(argv, input="{}", capture_output=True, text=True)
+
+
+def test_output_is_merged_in_configuration_order():
+    result = dispatch(("required", "sleep 0.2; echo first"), ("required", "echo second"))
+    assert (result.returncode, result.stdout) == (0, "first\nsecond\n")
+
+
+def test_payload_reaches_every_hook():
+    result = dispatch(("required", "cat"), ("required", "cat"))
+    assert result.stdout == "{}{}"
+
+
+def test_optional_output_is_never_merged():
+    for _ in range(3):
+        result = dispatch(("required", "sleep 0.1; echo required"), ("optional", "echo optional; exit 2"))
+        assert (result.returncode, result.stdout) == (0, "required\n")
+
+
+def test_hook_over_budget_is_cancelled():
+    start = time.monotonic()
+    result = dispatch(("required", "sleep 5; echo slow"), ("required", "echo fast"), budget_ms=200)
+    assert time.monotonic() - start < 3
+    assert (result.returncode, result.stdout) == (0, "fast\n")
+    assert "cancelled after 200ms: sleep 5; echo slow" in result.stderr
+
+
+def test_block_exit_code_wins_and_failed_output_is_dropped():
+    result = dispatch(
+        ("required", "echo blocked; echo reason >&2; exit 2"),
+        ("required", "echo broken; exit 1"),
+        ("required", "echo ok"),
+    )
+    assert (result.returncode, result.stdout) == (2, "ok\n")
+    assert "reason" in result.stderr
@@ -0,0 +1,49 @@
+import pytest
+
+import hookring
+
+
+@pytest.fixture
+def small_ring(monkeypatch):
+    monkeypatch.setattr(hookring, "CAPACITY", 4)
+    monkeypatch.setattr(hookring, "RING_BYTES", hookring.HEADER_BYTES + 4 * hookring.SLOT.size)
+
+
+def span(i, **fields):
+    return {"started": 1_700_000_000 + i, "duration_ms": i / 2, "bytes_in": i, "bytes_out": 2 * i,
+            "code": 0, "event": "UserPromptSubmit", "hook": f"hook-{i}.py", **fields}
+
+
+def test_spans_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUDE_INSTANCE", "B")
+    ring = tmp_path / "hooks.ring"
+    hookring.record(span(1, code=-9), ring)
+    hookring.record(span(2, hook="x" * 100, aggregate=True, instance="A"), ring)
+
+    first, second = hookring.read_spans(ring)
+    assert first == {**span(1, code=-9), "seq": 1, "instance": "B", "aggregate": False}
+    assert (second["hook"], second["instance"], second["aggregate"]) == ("x" * 64, "A", True)
+
+
+def test_ring_overwrites_the_oldest_spans(tmp_path, small_ring):
+    ring = tmp_path / "hooks.ring"
+    for i in range(1, 11):
+        hookring.record(span(i), ring)
+    spans = hookring.read_spans(ring)
+    assert [s["seq"] for s in spans] == [7, 8, 9, 10]
+    assert [s["hook"] for s in spans] == ["hook-7.py", "hook-8.py", "hook-9.py", "hook-10.py"]
+    assert ring.stat().st_size == hookring.RING_BYTES
+
+
+def test_ring_of_another_layout_is_reset(tmp_path, small_ring):
+    ring = tmp_path / "hooks.ring"
+    ring.write_bytes(b"HKRING01" + bytes(100))
+    assert hookring.read_spans(ring) == []
+
+    hookring.record(span(1), ring)
+    assert [s["hook"] for s in hookring.read_spans(ring)] == ["hook-1.py"]
+    assert ring.stat().st_size == hookring.RING_BYTES
+
+
+def test_missing_ring_reads_as_empty(tmp_path):
+    assert hookring.read_spans(tmp_path / "missing.ring") == []
@@ -0,0 +1,214 @@
+import json
+import os
+import random
+import time
+
+import pytest
+
+from conftest import load_script
+
+pool_store = load_script("pool-store.py")
+
+NOW = 1_700_000_000
+
+
+def entry(i, ts):
+    return {"id": i, "timestamp": ts, "source_instance": "ABC"[i % 3], "summary": f"entry {i}"}
+
+
+def write_source(path, entries, partial=b""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as f:
+        for e in entries:
+            f.write(json.dumps(e).encode() + b"\n")
+        f.write(partial)
+
+
+def sync(store, source):
+    with store.writer():
+        written = store.sync(source)
+        store.write_state()
+    return written
+
+
+@pytest.fixture(params=sorted(pool_store.BACKENDS))
+def backend(request):
+    return pool_store.BACKENDS[request.param]
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    """Force many segments and index samples so seeks cross segment boundaries."""
+    monkeypatch.setattr(pool_store, "SEGMENT_BYTES", 4096)
+    monkeypatch.setattr(pool_store, "INDEX_EVERY", 4)
+
+
+def test_sync_ingests_complete_lines_and_resumes(tmp_path, backend):
+    source = tmp_path / pool_store.SOURCE_FILE
+    write_source(source, [entry(0, NOW), entry(1, NOW + 1)], partial=b'{"id": 2, "times')
+    store = backend(tmp_path)
+    assert sync(store, source) == 2
+
+    with open(source, "ab") as f:
+        f.write(b'tamp": %d}\n' % (NOW + 2))
+    write_source(source, [entry(3, NOW + 3)])
+    store = backend(tmp_path)
+    assert sync(store, source) == 2
+    assert [e["id"] for e in store.since(0)] == [0, 1, 2, 3]
+    assert sync(store, source) == 0
+
+
+def test_sync_after_source_replaced_skips_entries_already_stored(tmp_path, backend):
+    source = tmp_path / pool_store.SOURCE_FILE
+    write_source(source, [entry(i, NOW + i) for i in range(3)])
+    store = backend(tmp_path)
+    sync(store, source)
+
+    replacement = source.with_suffix(".new")
+    write_source(replacement, [entry(i, NOW + i) for i in range(5)])
+    os.replace(replacement, source)
+    assert sync(store, source) == 2
+    assert [e["id"] for e in store.since(0)] == [0, 1, 2, 3, 4]
+
+
+def test_refresh_without_new_lines_saves_nothing(tmp_path, backend):
+    source = tmp_path / pool_store.SOURCE_FILE
+    store = backend(tmp_path)
+    assert pool_store.refresh(store, source, compact=False) == 0
+    assert store.state["version"] == 0
+
+    write_source(source, [entry(0, NOW)])
+    assert pool_store.refresh(store, source, compact=False) == 1
+    version = store.state["version"]
+    write_source(source, [], partial=b'{"id": 1, "times')
+    for _ in range(3):
+        store = backend(tmp_path)
+        assert pool_store.refresh(store, source, compact=False) == 0
+        assert store.state["version"] == version
+
+
+def test_since_matches_brute_force_filter(tmp_path, backend, small_segments):
+    rng = random.Random(5)
+    # Mostly increasing timestamps with late arrivals, as several instances produce
+    entries = [entry(i, NOW + i * 10 - rng.choice([0, 0, 0, 50, 400])) for i in range(600)]
+    store = backend(tmp_path)
+    with store.writer():
+        store.append(entries)
+        store.write_state()
+
+    if backend is pool_store.SegmentStore:
+        assert len(store.state["segments"]) > 5
+    for cutoff in [0, NOW, NOW + 1234, NOW + 3000.5, NOW + 5990, NOW + 10_000]:
+        expected = {e["id"] for e in entries if e["timestamp"] >= cutoff}
+        got = [e["id"] for e in store.since(cutoff)]
+        assert len(got) == len(set(got))
+        assert set(got) == expected
+
+
+def test_seek_offset_lands_on_a_record_before_the_cutoff(tmp_path, small_segments):
+    store = pool_store.SegmentStore(tmp_path)
+    with store.writer():
+        store.append(entry(i, NOW + i) for i in range(40))
+        store.write_state()
+    segment = store.state["segments"][0]
+    data = store.segment_path(segment["seq"]).read_bytes()
+
+    for cutoff in [NOW - 5, NOW + 9, NOW + 13, NOW + 39]:
+        offset = store.seek_offset(segment["seq"], cutoff)
+        assert offset == 0 or data[offset - 1:offset] == b"\n"
+        first = json.loads(data[offset:data.index(b"\n", offset)])
+        assert first["timestamp"] < cutoff or offset == 0
+    # Past the last sample: seek to the last sampled record, not the start
+    assert store.seek_offset(segment["seq"], NOW + 1000) > 0
+
+
+def test_compact_drops_old_entries_and_keeps_queries_exact(tmp_path, backend, small_segments):
+    entries = [entry(i, NOW + i * 60) for i in range(300)]
+    store = backend(tmp_path)
+    with store.writer():
+        store.append(entries)
+        store.write_state()
+
+    now = NOW + 300 * 60
+    retain = 100 * 60 + 30
+    with store.writer():
+        removed = store.compact(retain, now=now)
+        store.write_state()
+    kept = [e["id"] for e in entries if e["timestamp"] >= now - retain]
+    assert removed == len(entries) - len(kept)
+
+    store = backend(tmp_path)
+    assert [e["id"] for e in store.since(0)] == kept
+    assert [e["id"] for e in store.since(NOW + 250 * 60)] == kept[-50:]
+    if backend is pool_store.SegmentStore:
+        assert sum(s["count"] for s in store.state["segments"]) == len(kept)
+        on_disk = {p.name for p in store.dir.iterdir() if p.suffix in (".seg", ".idx")}
+        expected = {store.segment_path(s["seq"], suffix).name
+                    for s in store.state["segments"] for suffix in (".seg", ".idx")}
+        assert on_disk == expected
+
+
+def test_compact_drops_late_arrivals(tmp_path, backend):
+    store = backend(tmp_path)
+    with store.writer():
+        store.append([{"summary": "no timestamp"}, entry(1, NOW), entry(2, NOW - 3600)])
+        store.write_state()
+    with store.writer():
+        assert store.compact(60) == 2
+        store.write_state()
+
+    store = backend(tmp_path)
+    # Stored without a timestamp: stamped on append, in both backends
+    assert [e["summary"] for e in store.since(0)] == ["no timestamp"]
+    assert list(store.since(time.time() + 60)) == []
+
+
+def test_appends_continue_after_compaction(tmp_path, backend, small_segments):
+    store = backend(tmp_path)
+    with store.writer():
+        store.append(entry(i, NOW + i * 60) for i in range(100))
+        store.write_state()
+    with store.writer():
+        store.compact(30 * 60, now=NOW + 100 * 60)
+        store.append(entry(i, NOW + i * 60) for i in range(100, 110))
+        store.write_state()
+
+    store = backend(tmp_path)
+    assert [e["id"] for e in store.since(0)] == list(range(70, 110))
+
+
+def test_writer_discards_bytes_from_a_crashed_append(tmp_path, small_segments):
+    source = tmp_path / pool_store.SOURCE_FILE
+    write_source(source, [entry(i, NOW + i) for i in range(10)])
+    store = pool_store.SegmentStore(tmp_path)
+    sync(store, source)
+
+    # A writer that dies after appending but before saving state.json
+    write_source(source, [entry(i, NOW + i) for i in range(10, 20)])
+    crashed = pool_store.SegmentStore(tmp_path)
+    with crashed.writer():
+        crashed.sync(source)
+    segment = store.state["segments"][-1]
+    assert store.segment_path(segment["seq"]).stat().st_size > segment["bytes"]
+
+    store = pool_store.SegmentStore(tmp_path)
+    assert sync(store, source) == 10
+    ids = [e["id"] for e in store.since(0)]
+    assert ids == list(range(20))
+    for segment in store.state["segments"]:
+        assert store.segment_path(segment["seq"]).stat().st_size == segment["bytes"]
+        samples = -(-segment["count"] // pool_store.INDEX_EVERY)
+        assert store.segment_path(segment["seq"], ".idx").stat().st_size == \
+            samples * pool_store.INDEX_SAMPLE.size
+
+
+def test_sqlite_writer_rolls_back_on_error(tmp_path):
+    store = pool_store.SqliteStore(tmp_path)
+    with pytest.raises(RuntimeError):
+        with store.writer():
+            store.append([entry(0, NOW)])
+            store.write_state()
+            raise RuntimeError("crash")
+    store = pool_store.SqliteStore(tmp_path)
+    assert store.is_empty()
+    assert store.state["version"] == 0
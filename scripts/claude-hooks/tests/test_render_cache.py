@@ -0,0 +1,63 @@
+import time
+
+from hooklib import RenderCache
+
+
+def test_hits_are_counted_across_processes(tmp_path):
+    first = RenderCache(tmp_path)
+    first.get_or_render(("load", 1), lambda: "block\n")
+    # A fresh instance stands in for the next per-process hook
+    for _ in range(3):
+        assert RenderCache(tmp_path).get_or_render(("load", 1), lambda: "rendered again\n") == "block\n"
+    assert RenderCache(tmp_path).load_stats() == {"hits": 3, "misses": 1, "evictions": 0}
+
+
+def test_counts_fold_into_stats_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(RenderCache, "COUNTS_FOLD", 4)
+    cache = RenderCache(tmp_path)
+    for i in range(3):
+        cache.get_or_render(("query", i), lambda: "x\n")
+        cache.get_or_render(("query", i), lambda: "x\n")
+    assert (tmp_path / "stats.json").exists()
+    assert (tmp_path / "counts").stat().st_size < 4
+    assert cache.load_stats() == {"hits": 3, "misses": 3, "evictions": 0}
+
+
+def cached(directory, *keys):
+    """Keys whose blocks a fresh cache (i.e. the next per-process hook) finds on disk."""
+    cache = RenderCache(directory)
+    return [key for key in keys if cache.lookup(cache.key("load", key)) is not None]
+
+
+def test_least_recently_used_block_is_evicted(tmp_path):
+    cache = RenderCache(tmp_path, max_entries=2)
+    for key in ("a", "b"):
+        cache.get_or_render(("load", key), lambda: f"{key}\n")
+        time.sleep(0.02)
+    cache.get_or_render(("load", "a"), lambda: "a\n")
+    time.sleep(0.02)
+    cache.get_or_render(("load", "c"), lambda: "c\n")
+
+    assert cached(tmp_path, "a", "b", "c") == ["a", "c"]
+    assert list(cache.memory) == [cache.key("load", "a"), cache.key("load", "c")]
+    assert cache.load_stats()["evictions"] == 1
+
+
+def test_total_size_is_capped(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=10)
+    cache.get_or_render(("load", "a"), lambda: "aaaaa\n")
+    time.sleep(0.02)
+    cache.get_or_render(("load", "b"), lambda: "bbbbb\n")
+    assert cached(tmp_path, "a", "b") == ["b"]
+
+
+def test_oversized_block_is_not_cached(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=10)
+    cache.get_or_render(("load", "small"), lambda: "small\n")
+    renders = []
+    for _ in range(2):
+        text = cache.get_or_render(("load", "big"), lambda: renders.append(1) or "x" * 20)
+        assert text == "x" * 20
+    assert len(renders) == 2
+    assert cached(tmp_path, "small", "big") == ["small"]
+    assert cache.load_stats() == {"hits": 0, "misses": 3, "evictions": 0}
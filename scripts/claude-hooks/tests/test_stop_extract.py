@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import HELPERS
+
+# Records what it was given and exits with $EXTRACTOR_EXIT
+EXTRACTOR = """
+import json, os, sys
+payload = json.load(sys.stdin)
+with open(payload["transcript_path"], "rb") as delta, open(os.environ["SEEN"], "ab") as seen:
+    seen.write(delta.read())
+sys.exit(int(os.environ.get("EXTRACTOR_EXIT", "0")))
+"""
+
+
+def turn(role, text):
+    return json.dumps({"type": role, "message": {"role": role, "content": text}}).encode() + b"\n"
+
+
+@pytest.fixture
+def session(tmp_path):
+    extractor = tmp_path / "extractor.py"
+    extractor.write_text(EXTRACTOR)
+    transcript = tmp_path / "transcript.jsonl"
+    transcript.write_bytes(b"")
+    seen = tmp_path / "seen.jsonl"
+
+    def stop(exit_code=0):
+        env = {**os.environ, "CLAUDE_PROJECT_DIR": str(tmp_path), "SEEN": str(seen),
+               "EXTRACTOR_EXIT": str(exit_code)}
+        payload = {"session_id": "s1", "transcript_path": str(transcript)}
+        return subprocess.run(
+            [sys.executable, str(HELPERS / "stop-extract.py"), "--extractor", str(extractor)],
+            input=json.dumps(payload).encode(), env=env, capture_output=True,
+        ).returncode
+
+    def seen_turns():
+        if not seen.exists():
+            return []
+        return [json.loads(line)["message"]["content"] for line in seen.read_bytes().splitlines()]
+
+    return transcript, stop, seen_turns
+
+
+def append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def test_only_new_complete_turns_reach_the_extractor(session):
+    transcript, stop, seen_turns = session
+    append(transcript, turn("user", "one") + b'{"type": "summary"}\n' + turn("assistant", "two"))
+    partial = turn("user", "three")
+    append(transcript, partial[:10])
+    assert stop() == 0
+    assert seen_turns() == ["one", "two"]
+
+    append(transcript, partial[10:] + turn("assistant", "four"))
+    assert stop() == 0
+    assert seen_turns() == ["one", "two", "three", "four"]
+    # Nothing new: the extractor is not run again
+    assert stop() == 0
+    assert seen_turns() == ["one", "two", "three", "four"]
+
+
+def test_checkpoint_stays_when_the_extractor_fails(session):
+    transcript, stop, seen_turns = session
+    append(transcript, turn("user", "one"))
+    assert stop(exit_code=1) == 1
+    assert stop() == 0
+    assert seen_turns() == ["one", "one"]
+
+
+def test_replaced_transcript_is_read_from_the_start(session):
+    transcript, stop, seen_turns = session
+    append(transcript, turn("user", "one") + turn("assistant", "two"))
+    assert stop() == 0
+
+    replacement = transcript.with_suffix(".new")
+    replacement.write_bytes(turn("user", "uno") + turn("assistant", "dos") + turn("user", "tres"))
+    os.replace(replacement, transcript)
+    assert stop() == 0
+    assert seen_turns() == ["one", "two", "uno", "dos", "tres"]
@@ -2,54 +2,359 @@
 """
 Configure Claude Code hooks for Claude Cognitive system.
 This adds hooks to ~/.claude/settings.json
+
+Usage:
+  python3 setup-claude-hooks.py            # one python3 process per hook
+  python3 setup-claude-hooks.py --daemon   # forward hooks to hook-daemon.py
+  python3 setup-claude-hooks.py --dispatch # run each event's hooks concurrently
+  python3 setup-claude-hooks.py --pool-store  # load the pool from pool-store.py
+  python3 setup-claude-hooks.py --pool-store sqlite  # ... backed by SQLite (WAL)
+  python3 setup-claude-hooks.py --incremental-stop  # extract only new transcript turns
+  python3 setup-claude-hooks.py --optimize # run hooks from a precompiled zipapp
+  python3 setup-claude-hooks.py --index-refresh  # refresh the attention index at SessionStart
+  python3 setup-claude-hooks.py --trace    # record a span per hook run
+  python3 setup-claude-hooks.py --bench    # benchmark the configured hooks
+  python3 setup-claude-hooks.py --report   # summarize the recorded spans
 """
 
+import argparse
+import functools
 import json
+import marshal
+import shlex
+import shutil
+import subprocess
+import sys
+import zipfile
 from pathlib import Path
 
-settings_file = Path.home() / ".claude/settings.json"
-
-# Load existing or create new
-if settings_file.exists():
-    with open(settings_file) as f:
-        settings = json.load(f)
-    print("✓ Loaded existing settings")
-else:
-    settings = {}
-    print("✓ Creating new settings file")
-
-# Ensure hooks structure exists
-if "hooks" not in settings:
-    settings["hooks"] = {}
-
-# Add UserPromptSubmit hooks
-settings["hooks"]["UserPromptSubmit"] = [{
-    "hooks": [
-        {"type": "command", "command": "python3 ~/.claude/scripts/context-router-v2.py"},
-        {"type": "command", "command": "python3 ~/.claude/scripts/pool-auto-update.py"}
-    ]
-}]
-
-# Add SessionStart hook
-settings["hooks"]["SessionStart"] = [{
-    "hooks": [
-        {"type": "command", "command": "python3 ~/.claude/scripts/pool-loader.py"}
-    ]
-}]
-
-# Add Stop hook
-settings["hooks"]["Stop"] = [{
-    "hooks": [
-        {"type": "command", "command": "python3 ~/.claude/scripts/pool-extractor.py"}
-    ]
-}]
-
-# Write back
-with open(settings_file, "w") as f:
-    json.dump(settings, f, indent=2)
-
-print("✓ Hooks configured successfully")
-print("\nAdded hooks:")
-print("  - UserPromptSubmit: context-router-v2.py + pool-auto-update.py")
-print("  - SessionStart: pool-loader.py")
-print("  - Stop: pool-extractor.py")
\ No newline at end of file
+claude_dir = Path.home() / ".claude"
+settings_file = claude_dir / "settings.json"
+scripts_dir = claude_dir / "scripts"
+project_dir = Path(__file__).resolve().parent
+helpers_dir = project_dir / "scripts/claude-hooks"
+
+# Hook scripts installed from claude-cognitive, in the order they run
+HOOK_SCRIPTS = {
+    "UserPromptSubmit": ["context-router-v2.py", "pool-auto-update.py"],
+    "SessionStart": ["pool-loader.py"],
+    "Stop": ["pool-extractor.py"],
+}
+
+# Hooks run only for their side effects under --dispatch: not waited for,
+# output ignored. Matched on the script name without arguments
+BACKGROUND_HOOKS = {"pool-auto-update.py", "pool-store.py"}
+
+# Incremental attention index refresh, run before the pool loads (--index-refresh)
+INDEX_REFRESH = "attention-index.py build --quiet"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Configure Claude Cognitive hooks")
+    startup = parser.add_mutually_exclusive_group()
+    startup.add_argument(
+        "--daemon",
+        action="store_true",
+        help="route hooks through hook-daemon.py (falls back to per-process scripts)",
+    )
+    startup.add_argument(
+        "--optimize",
+        action="store_true",
+        help="run hooks from hooks.pyz, a precompiled zipapp, with -I -S where safe",
+    )
+    parser.add_argument(
+        "--dispatch",
+        action="store_true",
+        help="install one hook-dispatch.py entry per event that runs its hooks concurrently",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=int,
+        default=2000,
+        help="per-event latency budget for --dispatch (default: 2000)",
+    )
+    parser.add_argument(
+        "--pool-store",
+        nargs="?",
+        const="segments",
+        choices=["segments", "sqlite"],
+        help="load the pool at SessionStart from pool-store.py, using the given backend "
+             "(default: segments); new entries are ingested after each prompt",
+    )
+    parser.add_argument(
+        "--incremental-stop",
+        action="store_true",
+        help="run pool-extractor.py at Stop on new transcript turns only (stop-extract.py)",
+    )
+    parser.add_argument(
+        "--index-refresh",
+        action="store_true",
+        help="refresh the attention index at SessionStart, for a router that reads it "
+             "(attention-index.py query); skipped outside git work trees",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="benchmark the hooks already in settings.json instead of configuring them",
+    )
+    parser.add_argument("--bench-sizes", default="10,1000,100000", help="pool sizes for --bench")
+    parser.add_argument("--bench-runs", type=int, default=20, help="prompts per pool size for --bench")
+    parser.add_argument("--bench-sessions", type=int, default=5,
+                        help="sessions the --bench prompts are spread over")
+    parser.add_argument("--bench-out", default="hook-bench.json", help="results file for --bench")
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="record each hook run's latency, output size and exit code (see hook-trace.py)",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="summarize the spans recorded by --trace instead of configuring hooks",
+    )
+    parser.add_argument("--report-since", help="only report spans newer than this, e.g. 24h")
+    return parser.parse_args()
+
+
+def load_settings():
+    if settings_file.exists():
+        with open(settings_file) as f:
+            settings = json.load(f)
+        print("✓ Loaded existing settings")
+    else:
+        settings = {}
+        print("✓ Creating new settings file")
+    return settings
+
+
+def install_helpers():
+    """Copy the helper scripts from scripts/claude-hooks/ next to the hook scripts."""
+    scripts_dir.mkdir(parents=True, exist_ok=True)
+    for helper in sorted(helpers_dir.glob("*.py")):
+        shutil.copy2(helper, scripts_dir / helper.name)
+    print(f"✓ Installed helper scripts to {scripts_dir}")
+
+
+def build_index():
+    """Build (or incrementally refresh) the attention index for this project."""
+    subprocess.run(
+        [sys.executable, str(scripts_dir / "attention-index.py"), "build", "--root", str(project_dir)],
+        check=False,
+    )
+
+
+def sync_pool_store(backend):
+    """Import the existing pool file into the time-indexed store."""
+    subprocess.run(
+        [sys.executable, str(scripts_dir / "pool-store.py"), "--root", str(project_dir),
+         "--backend", backend, "sync"],
+        check=False,
+    )
+
+
+def event_scripts(args):
+    scripts = {event: list(names) for event, names in HOOK_SCRIPTS.items()}
+    if args.pool_store:
+        store = f"pool-store.py --backend {args.pool_store}"
+        scripts["SessionStart"] = [f"{store} load" if s == "pool-loader.py" else s
+                                   for s in scripts["SessionStart"]]
+        # Ingest (and push to watchers) what pool-auto-update.py wrote; chained
+        # after it, since hooks of one event (and --dispatch) run in parallel
+        scripts["UserPromptSubmit"] = [(s, f"{store} sync --quiet") if s == "pool-auto-update.py" else s
+                                       for s in scripts["UserPromptSubmit"]]
+    if args.incremental_stop:
+        scripts["Stop"] = ["stop-extract.py" if s == "pool-extractor.py" else s
+                           for s in scripts["Stop"]]
+    return scripts
+
+
+def steps(script):
+    """Scripts a hook entry runs in order: one, or a chain given as a tuple."""
+    return script if isinstance(script, tuple) else (script,)
+
+
+def describe(script):
+    return " && ".join(steps(script))
+
+
+def build_bundle():
+    """Bundle the scripts into hooks.pyz (hook-bundle.py) and check it is fresh."""
+    subprocess.run([sys.executable, str(scripts_dir / "hook-bundle.py"), "build"], check=True)
+    subprocess.run([sys.executable, str(scripts_dir / "hook-bundle.py"), "verify"], check=True)
+
+
+@functools.lru_cache(maxsize=None)
+def bundle_flags():
+    """Interpreter flags hook-bundle.py found safe for each script."""
+    with zipfile.ZipFile(scripts_dir / "hooks.pyz") as bundle:
+        manifest = marshal.loads(bundle.read("manifest.marshal"))
+    return {name: entry["flags"] for name, entry in manifest["scripts"].items()}
+
+
+def script_command(script, args):
+    """Command that runs a script from ~/.claude/scripts in its own interpreter."""
+    if args.optimize:
+        flags = bundle_flags().get(script.split()[0], "")
+        python = f"python3 {flags}" if flags else "python3"
+        return f"{python} ~/.claude/scripts/hooks.pyz {script}"
+    return f"python3 ~/.claude/scripts/{script}"
+
+
+# Where hook-daemon.py listens; mirrors hooklib.socket_path() for the shell
+DAEMON_SOCKET = '"${CLAUDE_HOOK_SOCKET:-$HOME/.claude/run/hook-daemon.sock}"'
+
+
+def hook_command(script, args, trace=None):
+    """Shell command for script; with trace (a hook event) each run records a span."""
+    if isinstance(script, tuple):
+        # Later steps only run once the earlier ones succeeded
+        return " && ".join(hook_command(step, args, trace) for step in script)
+    local = traced(trace, script, script_command(script, args), args)
+    if args.daemon:
+        # Test for the socket in the shell so a stopped daemon costs no extra
+        # interpreter; the client needs only the stdlib, hence -S
+        client = f"hook-client.py --trace {trace}" if trace else "hook-client.py"
+        return (f"if [ -S {DAEMON_SOCKET} ]; "
+                f"then python3 -S ~/.claude/scripts/{client} {script}; "
+                f"else {local}; fi")
+    return local
+
+
+def traced(event, script, command, args):
+    """command wrapped in hook-trace.py when tracing event, else unchanged.
+
+    Only for hooks that run in their own process: hook-client.py and
+    hook-dispatch.py record the spans of the hooks they run themselves.
+    """
+    if event is None:
+        return command
+    trace = f"hook-trace.py run --event {event} --hook {shlex.quote(script)} -- {shlex.quote(command)}"
+    return script_command(trace, args)
+
+
+def dispatch_command(event, scripts, args):
+    command = script_command(f"hook-dispatch.py --budget-ms {args.budget_ms}", args)
+    trace = event if args.trace else None
+    hooks = []
+    for script in scripts:
+        if steps(script)[0].split()[0] in BACKGROUND_HOOKS:
+            # The dispatcher may return before it finishes, so it records its own span
+            hooks.append(f"--optional {shlex.quote(hook_command(script, args, trace))}")
+        else:
+            if trace:
+                command += f" --name {shlex.quote(describe(script))}"
+            hooks.append(f"--required {shlex.quote(hook_command(script, args))}")
+    if trace:
+        command += f" --trace {event}"
+    return " ".join([command, *hooks])
+
+
+def build_hooks(args):
+    hooks = {}
+    for event, scripts in event_scripts(args).items():
+        trace = event if args.trace else None
+        if args.dispatch and len(scripts) > 1:
+            commands = [dispatch_command(event, scripts, args)]
+        else:
+            commands = [hook_command(script, args, trace) for script in scripts]
+        if event == "SessionStart" and args.index_refresh:
+            commands.insert(0, traced(trace, INDEX_REFRESH, script_command(INDEX_REFRESH, args), args))
+        hooks[event] = [{
+            "hooks": [{"type": "command", "command": command} for command in commands]
+        }]
+    return hooks
+
+
+def run_bench(args):
+    """Replay a synthetic session through the configured hooks (hook-bench.py).
+
+    Runs the benchmark from this checkout so the installed scripts stay as they are.
+    """
+    if not settings_file.exists():
+        print(f"✗ {settings_file} not found, configure hooks first")
+        return 1
+    return subprocess.call([
+        sys.executable, str(helpers_dir / "hook-bench.py"),
+        "--settings", str(settings_file),
+        "--sizes", args.bench_sizes,
+        "--runs", str(args.bench_runs),
+        "--sessions", str(args.bench_sessions),
+        "--out", args.bench_out,
+    ])
+
+
+def run_report(args):
+    """Summarize the spans hook-trace.py recorded (slowest hooks, largest injections)."""
+    command = [sys.executable, str(helpers_dir / "hook-trace.py"), "report"]
+    if args.report_since:
+        command += ["--since", args.report_since]
+    return subprocess.call(command)
+
+
+def main():
+    args = parse_args()
+    if args.bench:
+        return run_bench(args)
+    if args.report:
+        return run_report(args)
+
+    settings = load_settings()
+
+    install_helpers()
+    if args.optimize:
+        build_bundle()
+    build_index()
+    if args.pool_store:
+        sync_pool_store(args.pool_store)
+
+    # Ensure hooks structure exists
+    if "hooks" not in settings:
+        settings["hooks"] = {}
+    settings["hooks"].update(build_hooks(args))
+
+    # Write back
+    settings_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(settings_file, "w") as f:
+        json.dump(settings, f, indent=2)
+
+    print("✓ Hooks configured successfully")
+    print("\nAdded hooks:")
+    for event, scripts in event_scripts(args).items():
+        joiner = " | " if args.dispatch and len(scripts) > 1 else " + "
+        names = joiner.join(describe(script) for script in scripts)
+        if event == "SessionStart" and args.index_refresh:
+            names = "attention-index.py + " + names
+        print(f"  - {event}: {names}")
+
+    if args.daemon:
+        print("\nHooks go through hook-client.py. Start the daemon with:")
+        print("  python3 ~/.claude/scripts/hook-daemon.py &")
+        print("Without it running, each hook falls back to its own python3 process.")
+        print("The daemon runs one hook at a time for all instances; hooks that would wait")
+        print("behind another run in their own process instead.")
+        if args.dispatch:
+            print("With --dispatch most concurrent hooks will take that per-process path.")
+
+    if args.optimize:
+        print("\nImport time per hook, loose scripts vs hooks.pyz:")
+        hooks = [step for scripts in event_scripts(args).values()
+                 for script in scripts for step in steps(script)]
+        if args.index_refresh:
+            hooks.insert(0, INDEX_REFRESH)
+        subprocess.run([sys.executable, str(scripts_dir / "hook-bundle.py"), "report", *hooks])
+        print("Re-run with --optimize after upgrading ~/.claude/scripts/; until then the")
+        print("bundle notices the changed sources and runs them unbundled.")
+
+    if args.trace:
+        print("\nEach hook run is recorded in ~/.claude/metrics/hooks.ring. Summarize with:")
+        print("  python3 setup-claude-hooks.py --report")
+
+    if args.pool_store:
+        print("\nQuery the pool with:")
+        print(f"  python3 ~/.claude/scripts/pool-store.py --backend {args.pool_store} query --since 1h")
+        print("Watch entries from other instances (needs hook-daemon.py):")
+        print(f"  python3 ~/.claude/scripts/pool-store.py --backend {args.pool_store} watch")
+
+
+if __name__ == "__main__":
+    sys.exit(main())